@@ -1,24 +1,48 @@
+from __future__ import annotations
+
+import time
+_SCRIPT_STARTED = time.perf_counter()  # 콜드 스타트 측정용 (다른 import보다 먼저 실행)
+
 import streamlit as st
-from google.oauth2.service_account import Credentials
 import pandas as pd
+import numpy as np
 import uuid
-import os
+import hashlib
 import json
-import base64
-import streamlit.components.v1 as components
+import os
 from io import BytesIO
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaIoBaseUpload
-from googleapiclient.errors import HttpError
 from streamlit_oauth import OAuth2Component
-from datetime import datetime
-import requests
+from datetime import datetime, timezone
 import jwt
+import threading
+import atexit
+import random
+import logging
+import functools
+from collections import OrderedDict, defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from types import SimpleNamespace
+from typing import TYPE_CHECKING
 
-from supabase import create_client, Client
+# supabase, Pillow, 구글 API 클라이언트는 import 비용이 커서 실제로 쓰는 함수 안에서 불러옵니다.
+if TYPE_CHECKING:
+    from supabase import Client
+
+_IMPORTS_FINISHED = time.perf_counter()
+
+logger = logging.getLogger(__name__)
 
 # --- 상수 및 기본 설정 ---
 SUPABASE_BUCKET_NAME = "images"
+STORAGE_MAX_WORKERS = 4  # 이미지 업로드/삭제를 동시에 처리할 최대 작업자 수
+# 업로드 이미지 전처리 설정 (긴 변 기준 픽셀)
+IMAGE_MAX_DIMENSION = 1600
+IMAGE_THUMBNAIL_DIMENSION = 320
+IMAGE_FORMAT = "WEBP"
+IMAGE_CONTENT_TYPE = "image/webp"
+IMAGE_EXTENSION = "webp"
+IMAGE_QUALITY = 80
 
 # --- 과목 및 단원 데이터 ---
 # 이 사전을 수정하여 과목과 단원을 관리하세요.
@@ -35,6 +59,12 @@ CHAPTERS_BY_CATEGORY = {
     "기타": ["일반선택", "진로선택", "기타", "공부 외"]
 }
 
+# 스냅샷의 범주형(categorical) 컬럼이 사용할 값 목록
+PROBLEM_CATEGORIES = list(CHAPTERS_BY_CATEGORY.keys())
+PROBLEM_CHAPTERS = list(dict.fromkeys(chapter for chapters in CHAPTERS_BY_CATEGORY.values() for chapter in chapters))
+DIFFICULTIES = ["하", "중", "상"]
+QUESTION_TYPES = ["객관식", "주관식"]
+
 # Google Sheets 헤더 정의
 PROBLEM_HEADERS = [
     "id", "title", "category", "chapter", "difficulty", "question", "option1", "option2", "option3", "option4", 
@@ -57,18 +87,284 @@ TOKEN_ENDPOINT = "https://oauth2.googleapis.com/token"
 REVOKE_ENDPOINT = "https://oauth2.googleapis.com/revoke"
 SUPABASE_URL = st.secrets.get("SUPABASE_URL") or os.getenv("SUPABASE_URL")
 SUPABASE_KEY = st.secrets.get("SUPABASE_KEY") or os.getenv("SUPABASE_KEY")
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+
+# 문제 목록 표시 방식
+# - "snapshot": 전체 문제 스냅샷을 받아 화면에서 정렬/필터링 (기본값)
+# - "paged": 분류/검색/정렬을 DB 쿼리로 넘기고 현재 페이지의 문제만 조회
+PROBLEM_LIST_MODE = st.secrets.get("PROBLEM_LIST_MODE") or os.getenv("PROBLEM_LIST_MODE", "snapshot")
+PROBLEM_LIST_PAGE_SIZE = 20
+PROBLEM_LIST_COLUMNS = "id,title,category,chapter,difficulty,creator_name"
+PROBLEM_LIST_ORDERS = {"제목순": ("title", False), "최신순": ("created_at", True)}
+
+# --- 성능 측정 ---
+PERF_SAMPLES_PER_SPAN = 2000  # 구간마다 보관할 최근 측정값 수 (오래된 값부터 버림)
+PERF_PERCENTILES = (50, 95, 99)
+# 설정하면 이 포트의 /metrics에서 측정값을 Prometheus 텍스트 형식으로 내보냅니다.
+METRICS_PORT = st.secrets.get("METRICS_PORT") or os.getenv("METRICS_PORT")
+
+class PerfRecorder:
+    """구간별 소요 시간과 이벤트 카운터(캐시 적중/실패, 전송 행 수)를 모으는 프로세스 공용 기록기
+
+    구간마다 최근 PERF_SAMPLES_PER_SPAN개의 측정값만 링 버퍼(deque)에 두므로 메모리 사용량이 일정합니다.
+    """
+
+    def __init__(self):
+        self.samples = defaultdict(lambda: deque(maxlen=PERF_SAMPLES_PER_SPAN))  # 구간 -> 최근 소요 시간(초)
+        self.totals = defaultdict(lambda: [0, 0.0])  # 구간 -> [누적 횟수, 누적 시간] (버퍼와 상관없이 계속 증가)
+        self.counters = defaultdict(int)
+        self.lock = threading.Lock()
+
+    def record(self, name: str, seconds: float):
+        with self.lock:
+            self.samples[name].append(seconds)
+            total = self.totals[name]
+            total[0] += 1
+            total[1] += seconds
+
+    def increment(self, name: str, amount: int = 1):
+        with self.lock:
+            self.counters[name] += amount
+
+    def span_stats(self) -> list:
+        """구간별 누적 횟수/시간과 최근 측정값의 백분위수(초)"""
+        with self.lock:
+            samples = {name: np.fromiter(values, dtype=float) for name, values in self.samples.items()}
+            totals = {name: tuple(total) for name, total in self.totals.items()}
+        stats = []
+        for name, values in sorted(samples.items()):
+            p50, p95, p99 = np.percentile(values, PERF_PERCENTILES)
+            count, total_seconds = totals[name]
+            stats.append({"span": name, "count": count, "sum": total_seconds,
+                          "p50": p50, "p95": p95, "p99": p99, "max": values.max()})
+        return stats
+
+    def counter_values(self) -> dict:
+        with self.lock:
+            return dict(sorted(self.counters.items()))
+
+    def reset(self):
+        with self.lock:
+            self.samples.clear()
+            self.totals.clear()
+            self.counters.clear()
+
+    def prometheus_text(self) -> str:
+        """Prometheus 텍스트 형식 (구간은 summary, 카운터는 counter)"""
+        def label(value: str) -> str:
+            return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+        lines = [
+            "# HELP study_inside_span_seconds Time spent in instrumented spans.",
+            "# TYPE study_inside_span_seconds summary",
+        ]
+        for stat in self.span_stats():
+            span = label(stat["span"])
+            for percentile in PERF_PERCENTILES:
+                lines.append(f'study_inside_span_seconds{{span="{span}",quantile="{percentile / 100}"}} {stat[f"p{percentile}"]:.6f}')
+            lines.append(f'study_inside_span_seconds_sum{{span="{span}"}} {stat["sum"]:.6f}')
+            lines.append(f'study_inside_span_seconds_count{{span="{span}"}} {stat["count"]}')
+        lines += [
+            "# HELP study_inside_events_total Cache hits/misses and rows transferred.",
+            "# TYPE study_inside_events_total counter",
+        ]
+        for name, value in self.counter_values().items():
+            lines.append(f'study_inside_events_total{{name="{label(name)}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+@st.cache_resource
+def get_perf_recorder() -> PerfRecorder:
+    return PerfRecorder()
+
+# 구간마다 cache_resource를 조회하지 않도록 모듈에 한 번 받아 둡니다. (모든 세션이 같은 객체)
+perf = get_perf_recorder()
+
+@contextmanager
+def trace_span(name: str):
+    """with 블록의 실행 시간을 name 구간으로 기록 (예외나 st.rerun()으로 빠져나가도 기록)"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        perf.record(name, time.perf_counter() - started)
+
+def traced(func):
+    """함수 실행 시간을 함수 이름의 구간으로 기록하는 데코레이터"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with trace_span(func.__name__):
+            return func(*args, **kwargs)
+    return wrapper
+
+@st.cache_resource
+def start_metrics_exporter(port: int):
+    """/metrics 요청에 Prometheus 텍스트로 답하는 HTTP 서버를 백그라운드 스레드로 시작 (프로세스당 한 번)"""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    recorder = get_perf_recorder()
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = recorder.prometheus_text().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # 스크랩 요청마다 로그를 남기지 않음
+
+    try:
+        server = ThreadingHTTPServer(("0.0.0.0", port), MetricsHandler)
+    except OSError as e:
+        logger.warning("메트릭 서버를 %d 포트에서 시작하지 못했습니다: %s", port, e)
+        return None
+    threading.Thread(target=server.serve_forever, name="metrics-exporter", daemon=True).start()
+    return server
 
 # --- 관리자 확인 함수 ---
-def is_admin(supabase, email: str) -> bool:
-    """Supabase의 admin_emails 테이블에서 관리자 여부 확인"""
+ADMIN_CACHE_TTL = 60  # 관리자 목록을 다시 불러오는 간격(초)
+
+class AdminRoleCache:
+    """admin_emails 테이블 전체를 메모리에 두고 관리자 여부를 바로 확인하는 캐시
+
+    처음 한 번만 DB를 기다리고, 이후 TTL이 지나면 기존 목록으로 답하면서 백그라운드에서 새로 고칩니다.
+    공유 캐시가 있으면 다른 프로세스가 받아 둔 목록을 먼저 쓰고, 다른 프로세스가 목록을 비우면 바로 다시 읽습니다.
+    """
+
+    def __init__(self, shared_store: SharedCacheStore | None = None):
+        self.emails = frozenset()
+        self.loaded_at = None
+        self.refreshing = False
+        self.lock = threading.Lock()
+        self.shared_store = shared_store
+        self.shared_updated_at = None  # 공유 캐시에서 읽거나 올린 목록의 저장 시각
+
+    def contains(self, repo: Repository, email: str) -> bool:
+        if self.loaded_at is not None and self.shared_store is not None:
+            _, updated_at = self.shared_store.get_value("admin_emails")
+            if updated_at != self.shared_updated_at:
+                self.loaded_at = None  # 다른 프로세스가 목록을 새로 받았거나 비움
+        if self.loaded_at is None:
+            perf.increment("cache.admin_role.miss")
+            self.refresh(repo)
+        elif time.monotonic() - self.loaded_at >= ADMIN_CACHE_TTL:
+            perf.increment("cache.admin_role.stale")
+            self.refresh_in_background(repo)
+        else:
+            perf.increment("cache.admin_role.hit")
+        return email in self.emails
+
+    def refresh(self, repo: Repository):
+        if self.shared_store is not None:
+            emails, updated_at = self.shared_store.get_value("admin_emails")
+            if emails is not None and time.time() - updated_at < ADMIN_CACHE_TTL:
+                self.emails, self.shared_updated_at = frozenset(emails), updated_at
+                self.loaded_at = time.monotonic()
+                return
+        self.emails = repo.fetch_admin_emails()
+        if self.shared_store is not None:
+            self.shared_store.put_value("admin_emails", sorted(self.emails))
+            _, self.shared_updated_at = self.shared_store.get_value("admin_emails")
+        self.loaded_at = time.monotonic()
+
+    def refresh_in_background(self, repo: Repository):
+        with self.lock:
+            if self.refreshing:
+                return
+            self.refreshing = True
+
+        def _refresh():
+            try:
+                self.refresh(repo)
+            except Exception:
+                pass  # 다음 요청에서 다시 시도하며, 그동안은 기존 목록을 사용합니다.
+            finally:
+                self.refreshing = False
+
+        threading.Thread(target=_refresh, name="admin-role-refresh", daemon=True).start()
+
+    def invalidate(self):
+        self.loaded_at = None
+        if self.shared_store is not None:
+            self.shared_store.delete_value("admin_emails")
+
+@st.cache_resource
+def get_admin_role_cache() -> AdminRoleCache:
+    """모든 세션이 공유하는 관리자 목록 캐시"""
+    return AdminRoleCache(get_shared_cache())
+
+def invalidate_admin_cache():
+    """관리자 목록이 바뀌었을 때 다음 확인에서 DB를 다시 읽도록 캐시를 비웁니다."""
+    get_admin_role_cache().invalidate()
+
+@traced
+def is_admin(repo, email: str) -> bool:
+    """admin_emails 테이블에서 관리자 여부 확인 (캐시 사용)"""
     try:
-        res = supabase.table("admin_emails").select("email").eq("email", email).execute()
-        return len(res.data) > 0
+        return get_admin_role_cache().contains(repo, email)
     except Exception as e:
         st.error(f"관리자 확인 오류: {e}")
         return False
 
+# --- 로그인 사용자 확인 ---
+GOOGLE_JWKS_URL = "https://www.googleapis.com/oauth2/v3/certs"
+GOOGLE_ISSUERS = ("https://accounts.google.com", "accounts.google.com")
+GOOGLE_JWKS_CACHE_SECONDS = 6 * 60 * 60  # 모르는 kid가 오면 기다리지 않고 바로 다시 받습니다.
+ID_TOKEN_LEEWAY_SECONDS = 30  # 서버 간 시계 오차 허용
+
+@st.cache_resource
+def get_google_jwks_client() -> jwt.PyJWKClient:
+    """구글 ID 토큰 서명 공개키(JWKS)를 프로세스 안에 캐시하는 클라이언트"""
+    return jwt.PyJWKClient(GOOGLE_JWKS_URL, cache_jwk_set=True, lifespan=GOOGLE_JWKS_CACHE_SECONDS)
+
+def verify_id_token(id_token: str) -> dict:
+    """구글 ID 토큰의 서명, 대상(aud), 발급자(iss), 만료(exp)를 검증하고 클레임을 반환"""
+    signing_key = get_google_jwks_client().get_signing_key_from_jwt(id_token)
+    return jwt.decode(
+        id_token, signing_key.key, algorithms=["RS256"],
+        audience=CLIENT_ID, issuer=GOOGLE_ISSUERS, leeway=ID_TOKEN_LEEWAY_SECONDS
+    )
+
+def refresh_login_token(oauth2: OAuth2Component, token: dict) -> dict:
+    """refresh token으로 새 토큰을 받아 세션에 저장 (refresh token이 없으면 예외)"""
+    refreshed = dict(oauth2.refresh_token(token, force=True))
+    refreshed.setdefault("refresh_token", token.get("refresh_token"))  # 구글은 갱신 응답에 다시 주지 않음
+    st.session_state.token = refreshed
+    return refreshed
+
+def resolve_principal(repo: Repository, oauth2: OAuth2Component) -> dict | None:
+    """로그인 사용자(이름, 이메일, 관리자 여부)를 반환
+
+    한 번 검증한 사용자는 ID 토큰이 만료될 때까지 세션에 두고 그대로 씁니다.
+    만료되면 refresh token으로 갱신을 시도하고, 실패하면 예외가 발생합니다.
+    """
+    principal = st.session_state.get("user_info")
+    if principal and principal["expires_at"] > time.time():
+        return principal
+
+    token = st.session_state.token
+    if "id_token" not in token:
+        return None
+    try:
+        claims = verify_id_token(token["id_token"])
+    except jwt.ExpiredSignatureError:
+        token = refresh_login_token(oauth2, token)
+        claims = verify_id_token(token["id_token"])
+
+    principal = {
+        "name": claims.get("name") or claims.get("email"),
+        "email": claims.get("email"),
+        "picture": claims.get("picture"),
+        "is_admin": is_admin(repo, claims.get("email")),
+        "expires_at": claims["exp"],
+    }
+    st.session_state.user_info = principal
+    return principal
+
 # --- CSS 스타일 ---
 def apply_custom_css():
     st.markdown(r"""
@@ -107,8 +403,8 @@ def initialize_app_state():
         st.session_state.page = "목록"
     if 'selected_problem_id' not in st.session_state: 
         st.session_state.selected_problem_id = None
-    if 'problem_to_edit' not in st.session_state:
-        st.session_state.problem_to_edit = None
+    if 'problem_to_edit_id' not in st.session_state:
+        st.session_state.problem_to_edit_id = None
     if 'token' not in st.session_state: 
         st.session_state.token = None
     if 'user_info' not in st.session_state: 
@@ -117,6 +413,8 @@ def initialize_app_state():
 # --- 구글 API 연결 함수 ---
 @st.cache_resource
 def get_google_creds():
+    from google.oauth2.service_account import Credentials
+
     scopes = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
     if "gcp_service_account" in st.secrets:
         return Credentials.from_service_account_info(st.secrets["gcp_service_account"], scopes=scopes)
@@ -128,120 +426,2306 @@ def get_google_creds():
     st.error("🚨 구글 서비스 계정 정보를 찾을 수 없습니다.")
     st.stop()
 
+# --- 시작 시간 측정 ---
+@st.cache_resource
+def get_startup_timings() -> dict:
+    """프로세스가 뜬 뒤 처음 한 번씩만 기록하는 시작 단계별 소요 시간(초)"""
+    return {"import_seconds": _IMPORTS_FINISHED - _SCRIPT_STARTED}
+
+def record_startup_timing(name: str, seconds: float):
+    """처음 측정한 값만 남기고 로그로 남깁니다."""
+    timings = get_startup_timings()
+    if name not in timings:
+        timings[name] = seconds
+        logger.info("startup %s: %.3fs (import %.3fs)", name, seconds, timings["import_seconds"])
+
 # --- Supabase 연결 함수 ---
+# DB/Storage 호출이 함께 쓰는 HTTP 연결 풀 (세션, 스냅샷 갱신 스레드, 이미지 업로드 작업자가 공유)
+HTTP_POOL_MAX_CONNECTIONS = 20
+HTTP_POOL_MAX_KEEPALIVE = 10
+HTTP_KEEPALIVE_EXPIRY = 30  # 쉬고 있는 연결을 닫기까지의 시간(초)
+HTTP_CONNECT_TIMEOUT = 5
+HTTP_READ_TIMEOUT = 15  # DB 조회 기준 (이미지 업로드는 HTTP_STORAGE_TIMEOUT)
+HTTP_STORAGE_TIMEOUT = 30
+HTTP_POOL_TIMEOUT = 5  # 풀에 빈 연결이 없을 때 기다리는 시간(초)
+
 @st.cache_resource
-def init_supabase_client():
-    try:
-        supabase_url = st.secrets["SUPABASE_URL"]
-        supabase_key = st.secrets["SUPABASE_KEY"]
-    except KeyError:
-        st.error("🚨 secrets.toml 파일에 SUPABASE_URL과 SUPABASE_KEY를 설정해야 합니다.")
-        st.stop()
-    
-    if not supabase_url or not supabase_key:
-        st.error("🚨 Supabase URL 또는 Key 값이 비어있습니다. secrets.toml 파일을 확인하세요.")
+def get_http_client():
+    """프로세스 전체에서 함께 쓰는 keep-alive HTTP 연결 풀 (Supabase 호출과 이미지 캐시가 공유)"""
+    import httpx
+
+    return httpx.Client(
+        limits=httpx.Limits(
+            max_connections=HTTP_POOL_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_POOL_MAX_KEEPALIVE,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(
+            connect=HTTP_CONNECT_TIMEOUT, read=HTTP_READ_TIMEOUT, write=HTTP_STORAGE_TIMEOUT, pool=HTTP_POOL_TIMEOUT
+        ),
+        follow_redirects=True,
+        http2=True,
+    )
+
+@st.cache_resource
+def init_supabase_client() -> Client:
+    """프로세스 전체에서 함께 쓰는 Supabase 클라이언트 (로그인 후 처음 필요할 때 생성)"""
+    if not SUPABASE_URL or not SUPABASE_KEY:
+        st.error("🚨 Supabase URL 또는 Key 값이 비어있습니다. secrets.toml 파일이나 환경 변수를 확인하세요.")
         st.stop()
-        
-    return create_client(supabase_url, supabase_key)
 
-# --- Supabase Storage (파일) 처리 함수 ---
-def upload_image_to_storage(supabase: Client, bucket_name: str, image_file):
+    started = time.perf_counter()
+    from supabase import ClientOptions, create_client
+
+    # postgrest/storage 클라이언트가 각자 연결을 만들지 않고 keep-alive 풀 하나를 함께 씁니다.
+    http_client = get_http_client()
+    # 요청 시간 제한은 위 Timeout을 따르며, 아래 두 값은 라이브러리 쪽 기본값(120초/20초)을 맞춰 둔 것입니다.
+    options = ClientOptions(
+        httpx_client=http_client,
+        postgrest_client_timeout=HTTP_READ_TIMEOUT,
+        storage_client_timeout=HTTP_STORAGE_TIMEOUT,
+    )
+    client = create_client(SUPABASE_URL, SUPABASE_KEY, options=options)
+    record_startup_timing("client_init_seconds", time.perf_counter() - started)
+    return client
+
+# --- 데이터 저장소 ---
+# - "supabase": Supabase DB/Storage 사용 (기본값, 자주 읽는 조회는 로컬 SQLite 복제본에서 처리)
+# - "sqlite": 로컬 SQLite 파일만 사용 (개발/테스트용, Supabase 없이 실행)
+DATA_BACKEND = st.secrets.get("DATA_BACKEND") or os.getenv("DATA_BACKEND", "supabase")
+SQLITE_DB_PATH = st.secrets.get("SQLITE_DB_PATH") or os.getenv("SQLITE_DB_PATH", "study_inside.sqlite3")
+LOCAL_STORAGE_DIR = st.secrets.get("LOCAL_STORAGE_DIR") or os.getenv("LOCAL_STORAGE_DIR", "local_storage")
+# Supabase를 쓸 때 스냅샷 동기화로 채우는 로컬 복제본 ("0"이면 모든 조회를 원격으로 보냄)
+USE_LOCAL_REPLICA = (st.secrets.get("USE_LOCAL_REPLICA") or os.getenv("USE_LOCAL_REPLICA", "1")) != "0"
+LOCAL_REPLICA_PATH = st.secrets.get("LOCAL_REPLICA_PATH") or os.getenv("LOCAL_REPLICA_PATH", ":memory:")
+
+def escape_like(text: str) -> str:
+    """LIKE 패턴 문자(%, _)가 검색어 그대로 비교되도록 이스케이프"""
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+class Repository:
+    """문제/풀이/관리자 목록과 이미지 저장소에 접근하는 공통 인터페이스
+
+    앱의 나머지 코드는 이 메서드들만 사용하므로, 백엔드(Supabase, SQLite)를 바꿔 끼울 수 있습니다.
+    """
+
+    # True이면 fetch_problem/fetch_problem_page가 스냅샷 동기화로 채우는 로컬 복제본을 읽습니다.
+    serves_reads_from_replica = False
+
+    def fetch_rows(self, table_name: str, columns: str = "*", since_column: str = None, since: str = None) -> list:
+        """since_column >= since인 행을 since_column 오름차순으로 조회 (since가 없으면 전체)"""
+        raise NotImplementedError
+
+    def fetch_ids(self, table_name: str) -> set:
+        raise NotImplementedError
+
+    def fetch_change_marker(self, table_name: str, timestamp_column: str, count_rows: bool) -> tuple:
+        """변경 여부만 싸게 확인하기 위한 (최대 타임스탬프, 행 수) (count_rows가 False면 행 수는 None)"""
+        raise NotImplementedError
+
+    def fetch_problem(self, problem_id) -> dict | None:
+        raise NotImplementedError
+
+    def fetch_problem_page(self, columns: str, category: str | None, search_query: str, order_column: str,
+                           descending: bool, start: int, size: int, solved_by: str | None = None):
+        """조건에 맞는 문제 한 페이지와 전체 개수를 (행 목록, 개수)로 반환 (solved_by가 푼 문제는 제외)"""
+        raise NotImplementedError
+
+    def fetch_solution_page(self, start: int, size: int):
+        """풀이 기록 한 페이지(최근 저장 순)와 전체 개수를 (행 목록, 개수)로 반환"""
+        raise NotImplementedError
+
+    def fetch_admin_emails(self) -> frozenset:
+        raise NotImplementedError
+
+    def insert_problem(self, problem_data: dict) -> list:
+        """저장된 행 목록을 반환"""
+        raise NotImplementedError
+
+    def update_problem(self, problem_id, new_data: dict) -> list:
+        """수정된 행 목록을 반환"""
+        raise NotImplementedError
+
+    def delete_problem(self, problem_id):
+        raise NotImplementedError
+
+    def insert_solutions(self, rows: list):
+        """풀이 기록을 저장하되 (problem_id, user_email)이 이미 있는 행은 건너뜀"""
+        raise NotImplementedError
+
+    def upload_object(self, bucket_name: str, file_path: str, bytes_data: bytes, content_type: str):
+        """파일을 올립니다. 같은 경로의 파일이 이미 있으면 그대로 둡니다."""
+        raise NotImplementedError
+
+    def public_url(self, bucket_name: str, file_path: str) -> str:
+        raise NotImplementedError
+
+SUPABASE_PAGE_SIZE = 1000  # 한 번에 받을 행 수 (PostgREST의 기본 max-rows)
+
+class SupabaseRepository(Repository):
+    """Supabase DB/Storage를 직접 호출하는 저장소"""
+
+    def __init__(self, client: Client, url: str):
+        self.client = client
+        self.url = url
+
+    def fetch_rows(self, table_name, columns="*", since_column=None, since=None):
+        # PostgREST는 요청 하나에 최대 max-rows(기본 1000)행만 돌려주므로 짧은 페이지가 올 때까지 나눠 받습니다.
+        rows, start = [], 0
+        while True:
+            query = self.client.table(table_name).select(columns)
+            if since is not None:
+                query = query.gte(since_column, since)
+            if since_column is not None:
+                query = query.order(since_column)
+            page = query.order("id").range(start, start + SUPABASE_PAGE_SIZE - 1).execute().data
+            rows.extend(page)
+            if len(page) < SUPABASE_PAGE_SIZE:
+                return rows
+            start += SUPABASE_PAGE_SIZE
+
+    def fetch_ids(self, table_name):
+        # 삭제 확인에 쓰이므로 조회 중에 다른 행이 지워져도 건너뛰는 id가 없도록 offset 대신 마지막 id 다음부터 받습니다.
+        ids, last_id = set(), None
+        while True:
+            query = self.client.table(table_name).select("id")
+            if last_id is not None:
+                query = query.gt("id", last_id)
+            page = query.order("id").limit(SUPABASE_PAGE_SIZE).execute().data
+            ids.update(row["id"] for row in page)
+            if len(page) < SUPABASE_PAGE_SIZE:
+                return ids
+            last_id = page[-1]["id"]
+
+    def fetch_change_marker(self, table_name, timestamp_column, count_rows):
+        # 타임스탬프 인덱스로 최신 행 하나만 읽고, 삭제를 감지해야 하는 테이블만 행 수를 함께 셉니다.
+        query = self.client.table(table_name).select(timestamp_column, count="exact" if count_rows else None)
+        response = query.order(timestamp_column, desc=True).limit(1).execute()
+        latest = response.data[0][timestamp_column] if response.data else None
+        return latest, response.count if count_rows else None
+
+    def fetch_problem(self, problem_id):
+        data = self.client.table("problems").select("*").eq("id", problem_id).limit(1).execute().data
+        return data[0] if data else None
+
+    def fetch_problem_page(self, columns, category, search_query, order_column, descending, start, size,
+                           solved_by=None):
+        if solved_by is None:
+            query = self.client.table("problems").select(columns, count="exact")
+        else:
+            # 푼 문제 id를 URL에 모두 싣지 않도록 DB 함수의 anti-join으로 제외 (supabase/migrations 참고)
+            query = self.client.rpc("unsolved_problems", {"solver_email": solved_by}, count="exact", get=True)
+            query = query.select(columns)
+        if category is not None:
+            query = query.eq("category", category)
+        if search_query:
+            query = query.ilike("title", f"%{escape_like(search_query)}%")
+        response = (
+            query.order(order_column, desc=descending)
+            .order("id")  # 같은 값끼리도 페이지 경계가 흔들리지 않도록
+            .range(start, start + size - 1)
+            .execute()
+        )
+        return response.data, response.count or 0
+
+    def fetch_solution_page(self, start, size):
+        response = (
+            self.client.table("solutions").select("*", count="exact")
+            .order("created_at", desc=True).order("id")
+            .range(start, start + size - 1)
+            .execute()
+        )
+        return response.data, response.count or 0
+
+    def fetch_admin_emails(self):
+        return frozenset(row["email"] for row in self.client.table("admin_emails").select("email").execute().data)
+
+    def insert_problem(self, problem_data):
+        return self.client.table("problems").insert(problem_data).execute().data
+
+    def update_problem(self, problem_id, new_data):
+        return self.client.table("problems").update(new_data).eq("id", problem_id).execute().data
+
+    def delete_problem(self, problem_id):
+        self.client.table("problems").delete().eq("id", problem_id).execute()
+
+    def insert_solutions(self, rows):
+        # (problem_id, user_email) 고유 인덱스와 겹치는 행은 건너뜀 (supabase/migrations 참고)
+        self.client.table("solutions").upsert(rows, on_conflict="problem_id,user_email", ignore_duplicates=True).execute()
+
+    def upload_object(self, bucket_name, file_path, bytes_data, content_type):
+        try:
+            self.client.storage.from_(bucket_name).upload(
+                file=bytes_data, path=file_path, file_options={"content-type": content_type}
+            )
+        except Exception as e:
+            # 동시에 같은 파일을 올린 경우 (409 Duplicate)
+            if "Duplicate" in str(e) or "already exists" in str(e):
+                return
+            raise
+
+    def public_url(self, bucket_name, file_path):
+        """get_public_url 호출 없이 공개 버킷 파일의 URL을 만듭니다."""
+        return f"{self.url.rstrip('/')}/storage/v1/object/public/{bucket_name}/{file_path}"
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS problems (
+    id TEXT PRIMARY KEY, title TEXT, category TEXT, chapter TEXT, difficulty TEXT, question_type TEXT,
+    question TEXT, option1 TEXT, option2 TEXT, option3 TEXT, option4 TEXT, answer TEXT, explanation TEXT,
+    question_image_url TEXT, question_thumb_url TEXT, explanation_image_url TEXT, explanation_thumb_url TEXT,
+    creator_name TEXT, creator_email TEXT, created_at TEXT, updated_at TEXT
+);
+CREATE INDEX IF NOT EXISTS problems_updated_at_idx ON problems (updated_at);
+CREATE INDEX IF NOT EXISTS problems_category_created_at_idx ON problems (category, created_at);
+CREATE INDEX IF NOT EXISTS problems_category_title_idx ON problems (category, title);
+CREATE TABLE IF NOT EXISTS solutions (
+    id TEXT PRIMARY KEY, problem_id TEXT, user_email TEXT, user_name TEXT, solved_at TEXT, created_at TEXT,
+    UNIQUE (problem_id, user_email)
+);
+CREATE INDEX IF NOT EXISTS solutions_created_at_idx ON solutions (created_at);
+CREATE TABLE IF NOT EXISTS admin_emails (email TEXT PRIMARY KEY);
+"""
+
+class SQLiteRepository(Repository):
+    """로컬 SQLite 파일을 쓰는 저장소
+
+    DATA_BACKEND="sqlite"일 때는 단독 저장소로, Supabase를 쓸 때는 로컬 복제본(ReplicatedRepository)으로 쓰입니다.
+    이미지는 storage_dir 아래에 파일로 저장하고 파일 경로를 URL 대신 돌려줍니다. (st.image가 바로 읽을 수 있음)
+    """
+
+    def __init__(self, db_path: str, storage_dir: str = None):
+        import sqlite3
+
+        self.db_path = db_path
+        self.storage_dir = storage_dir
+        self.lock = threading.Lock()  # 연결 하나를 세션/작업자 스레드가 함께 씁니다.
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        if db_path != ":memory:":
+            self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SQLITE_SCHEMA)
+        self.table_columns = {
+            table_name: [row["name"] for row in self.conn.execute(f"PRAGMA table_info({table_name})")]
+            for table_name in ("problems", "solutions", "admin_emails")
+        }
+
+    def _query(self, sql: str, params=()) -> list:
+        with self.lock:
+            return [dict(row) for row in self.conn.execute(sql, params)]
+
+    def _execute(self, sql: str, params=()):
+        with self.lock, self.conn:
+            self.conn.execute(sql, params)
+
+    def _columns_sql(self, table_name: str, columns: str) -> str:
+        if columns == "*":
+            return "*"
+        names = [name.strip() for name in columns.split(",")]
+        unknown = set(names) - set(self.table_columns[table_name])
+        if unknown:
+            raise ValueError(f"{table_name} 테이블에 없는 컬럼입니다: {sorted(unknown)}")
+        return ", ".join(names)
+
+    def fetch_rows(self, table_name, columns="*", since_column=None, since=None):
+        sql = f"SELECT {self._columns_sql(table_name, columns)} FROM {table_name}"
+        params = []
+        if since is not None:
+            sql += f" WHERE {self._columns_sql(table_name, since_column)} >= ?"
+            params.append(since)
+        if since_column is not None:
+            sql += f" ORDER BY {self._columns_sql(table_name, since_column)}"
+        return self._query(sql, params)
+
+    def fetch_ids(self, table_name):
+        return {row["id"] for row in self._query(f"SELECT id FROM {table_name}")}
+
+    def fetch_change_marker(self, table_name, timestamp_column, count_rows):
+        column = self._columns_sql(table_name, timestamp_column)
+        row = self._query(f"SELECT MAX({column}) AS latest, COUNT(*) AS row_count FROM {table_name}")[0]
+        return row["latest"], row["row_count"] if count_rows else None
+
+    def fetch_problem(self, problem_id):
+        rows = self._query("SELECT * FROM problems WHERE id = ?", (problem_id,))
+        return rows[0] if rows else None
+
+    def fetch_problem_page(self, columns, category, search_query, order_column, descending, start, size,
+                           solved_by=None):
+        clauses, params = [], []
+        if category is not None:
+            clauses.append("category = ?")
+            params.append(category)
+        if solved_by is not None:
+            clauses.append("NOT EXISTS (SELECT 1 FROM solutions WHERE solutions.problem_id = problems.id "
+                           "AND solutions.user_email = ?)")
+            params.append(solved_by)
+        if search_query:
+            clauses.append("title LIKE ? ESCAPE '\\'")  # SQLite의 LIKE는 영문 대소문자를 구분하지 않음
+            params.append(f"%{escape_like(search_query)}%")
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        order = f"{self._columns_sql('problems', order_column)} {'DESC' if descending else 'ASC'}, id"
+        rows = self._query(
+            f"SELECT {self._columns_sql('problems', columns)} FROM problems{where} ORDER BY {order} LIMIT ? OFFSET ?",
+            params + [size, start],
+        )
+        total_count = self._query(f"SELECT COUNT(*) AS n FROM problems{where}", params)[0]["n"]
+        return rows, total_count
+
+    def fetch_solution_page(self, start, size):
+        rows = self._query("SELECT * FROM solutions ORDER BY created_at DESC, id LIMIT ? OFFSET ?", (size, start))
+        total_count = self._query("SELECT COUNT(*) AS n FROM solutions")[0]["n"]
+        return rows, total_count
+
+    def fetch_admin_emails(self):
+        return frozenset(row["email"] for row in self._query("SELECT email FROM admin_emails"))
+
+    def upsert_rows(self, table_name: str, rows: list):
+        """id가 같은 행은 새 값으로 덮어씁니다. (복제본 동기화용)
+
+        일부 컬럼만 있는 행(목록용 컬럼만 받은 문제 등)은 그 컬럼만 고치고 나머지 컬럼은 그대로 둡니다.
+        """
+        columns = self.table_columns[table_name]
+        with self.lock, self.conn:
+            for row in rows:
+                names = [name for name in columns if name in row]
+                sql = f"INSERT OR REPLACE INTO {table_name} ({', '.join(names)}) VALUES ({', '.join('?' * len(names))})"
+                if len(names) < len(columns):
+                    updates = ", ".join(f"{name} = excluded.{name}" for name in names if name != "id")
+                    sql = (f"INSERT INTO {table_name} ({', '.join(names)}) VALUES ({', '.join('?' * len(names))}) "
+                           f"ON CONFLICT(id) DO UPDATE SET {updates}")
+                self.conn.execute(sql, [row[name] for name in names])
+
+    def delete_rows(self, table_name: str, ids: list):
+        with self.lock, self.conn:
+            self.conn.executemany(f"DELETE FROM {table_name} WHERE id = ?", [(row_id,) for row_id in ids])
+
+    def insert_problem(self, problem_data):
+        # Supabase에서는 DB가 채우는 id, created_at, updated_at을 여기서 채웁니다.
+        now = datetime.now(timezone.utc).isoformat()
+        row = {"id": str(uuid.uuid4()), "created_at": now, **problem_data, "updated_at": now}
+        self.upsert_rows("problems", [row])
+        return [self.fetch_problem(row["id"])]
+
+    def update_problem(self, problem_id, new_data):
+        new_data = {**new_data, "updated_at": datetime.now(timezone.utc).isoformat()}
+        assignments = ", ".join(f"{self._columns_sql('problems', name)} = ?" for name in new_data)
+        self._execute(f"UPDATE problems SET {assignments} WHERE id = ?", [*new_data.values(), problem_id])
+        problem = self.fetch_problem(problem_id)
+        return [problem] if problem else []
+
+    def delete_problem(self, problem_id):
+        self._execute("DELETE FROM problems WHERE id = ?", (problem_id,))
+
+    def insert_solutions(self, rows):
+        now = datetime.now(timezone.utc).isoformat()
+        columns = self.table_columns["solutions"]
+        with self.lock, self.conn:
+            for row in rows:
+                row = {"created_at": now, **row}
+                names = [name for name in columns if name in row]
+                self.conn.execute(
+                    f"INSERT OR IGNORE INTO solutions ({', '.join(names)}) VALUES ({', '.join('?' * len(names))})",
+                    [row[name] for name in names],
+                )
+
+    def _object_path(self, bucket_name: str, file_path: str) -> str:
+        return os.path.join(os.path.abspath(self.storage_dir), bucket_name, file_path)
+
+    def upload_object(self, bucket_name, file_path, bytes_data, content_type):
+        object_path = self._object_path(bucket_name, file_path)
+        if os.path.exists(object_path):
+            return
+        os.makedirs(os.path.dirname(object_path), exist_ok=True)
+        temp_path = f"{object_path}.{uuid.uuid4().hex}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(bytes_data)
+        os.replace(temp_path, object_path)  # 동시에 같은 파일을 써도 반쯤 쓴 파일이 보이지 않음
+
+    def public_url(self, bucket_name, file_path):
+        return self._object_path(bucket_name, file_path)
+
+class ReplicatedRepository(Repository):
+    """쓰기와 동기화는 원격 저장소로, 문제 조회는 로컬 SQLite 복제본으로 보내는 저장소
+
+    복제본은 스냅샷 리스너(ReplicaTableListener)가 동기화한 변경분(목록용 컬럼)으로 채워집니다.
+    문제 전체 행은 처음 조회할 때 원격에서 받아 복제본에 채우고, 이후 수정되면(updated_at이 바뀌면) 다시 받습니다.
+    """
+
+    serves_reads_from_replica = True
+
+    def __init__(self, remote: Repository, replica: SQLiteRepository):
+        self.remote = remote
+        self.replica = replica
+        self.detail_versions = {}  # 문제 id -> 복제본에 전체 행을 채웠을 때의 updated_at
+
+    def fetch_rows(self, table_name, columns="*", since_column=None, since=None):
+        return self.remote.fetch_rows(table_name, columns, since_column, since)
+
+    def fetch_ids(self, table_name):
+        return self.remote.fetch_ids(table_name)
+
+    def fetch_change_marker(self, table_name, timestamp_column, count_rows):
+        return self.remote.fetch_change_marker(table_name, timestamp_column, count_rows)
+
+    def fetch_problem(self, problem_id):
+        problem = self.replica.fetch_problem(problem_id)
+        if problem is not None and self.detail_versions.get(problem_id) == problem["updated_at"]:
+            return problem
+        problem = self.remote.fetch_problem(problem_id)
+        if problem is not None:
+            self.replica.upsert_rows("problems", [problem])
+            self.detail_versions[problem_id] = problem["updated_at"]
+        return problem
+
+    def fetch_problem_page(self, *args, **kwargs):
+        return self.replica.fetch_problem_page(*args, **kwargs)
+
+    def fetch_solution_page(self, start, size):
+        return self.replica.fetch_solution_page(start, size)
+
+    def fetch_admin_emails(self):
+        return self.remote.fetch_admin_emails()
+
+    def insert_problem(self, problem_data):
+        return self.remote.insert_problem(problem_data)
+
+    def update_problem(self, problem_id, new_data):
+        return self.remote.update_problem(problem_id, new_data)
+
+    def delete_problem(self, problem_id):
+        self.remote.delete_problem(problem_id)
+
+    def insert_solutions(self, rows):
+        self.remote.insert_solutions(rows)
+
+    def upload_object(self, bucket_name, file_path, bytes_data, content_type):
+        self.remote.upload_object(bucket_name, file_path, bytes_data, content_type)
+
+    def public_url(self, bucket_name, file_path):
+        return self.remote.public_url(bucket_name, file_path)
+
+class ReplicaTableListener:
+    """스냅샷의 행 변경을 로컬 복제본 테이블에 그대로 반영하는 리스너"""
+
+    def __init__(self, replica: SQLiteRepository, table_name: str):
+        self.replica = replica
+        self.table_name = table_name
+
+    def upsert(self, rows):
+        self.replica.upsert_rows(self.table_name, rows)
+
+    def delete(self, ids):
+        self.replica.delete_rows(self.table_name, ids)
+
+class TracedRepository:
+    """저장소 메서드를 호출할 때마다 "<label>.<메서드>" 구간 시간과 받은 행 수를 기록하는 래퍼"""
+
+    def __init__(self, repo: Repository, label: str):
+        self.repo = repo
+        self.label = label
+
+    def __getattr__(self, name):
+        attr = getattr(self.repo, name)
+        if not callable(attr):
+            return attr
+        span_name = f"{self.label}.{name}"
+
+        def call(*args, **kwargs):
+            with trace_span(span_name):
+                result = attr(*args, **kwargs)
+            if isinstance(result, tuple):  # fetch_problem_page: (행 목록, 개수)
+                result_rows = result[0]
+            else:
+                result_rows = [result] if isinstance(result, dict) else result
+            if isinstance(result_rows, (list, set, frozenset)):
+                perf.increment(f"rows.{span_name}", len(result_rows))
+            return result
+
+        return call
+
+# --- 원격 호출 재시도/차단 ---
+HTTP_MAX_ATTEMPTS = 3  # 일시적인 오류일 때 같은 호출을 보내는 최대 횟수
+HTTP_RETRY_BASE_DELAY = 0.2  # 재시도 대기 시간의 상한(초), 시도마다 두 배 (0~상한 사이에서 무작위)
+HTTP_RETRY_MAX_DELAY = 2.0
+HTTP_RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+CIRCUIT_FAILURE_THRESHOLD = 5  # 이만큼 연속으로 실패하면 원격 호출을 잠시 멈춤
+CIRCUIT_RESET_TIMEOUT = 30  # 멈춘 뒤 시험 호출을 보내기까지의 시간(초)
+# 같은 요청을 다시 보내도 결과가 달라지지 않는 메서드 (insert_problem은 문제가 두 번 저장될 수 있어 제외)
+IDEMPOTENT_METHODS = {
+    "fetch_rows", "fetch_ids", "fetch_change_marker", "fetch_problem", "fetch_problem_page", "fetch_solution_page",
+    "fetch_admin_emails",
+    "update_problem", "delete_problem", "insert_solutions", "upload_object",
+}
+REMOTE_METHODS = IDEMPOTENT_METHODS | {"insert_problem"}
+
+class BackendUnavailableError(Exception):
+    """회로 차단기가 열려 있어 원격 호출을 보내지 않았을 때"""
+
+def is_transient_error(e: Exception) -> bool:
+    """연결/시간 초과 오류나 5xx, 429 응답처럼 다시 보내면 성공할 수 있는 오류인지"""
+    import httpx
+
+    if isinstance(e, httpx.TransportError):
+        return True
+    status = getattr(e, "status", None) or getattr(e, "status_code", None)
+    if status is None and isinstance(getattr(e, "code", None), (int, str)):
+        status = e.code  # postgrest APIError는 HTTP 상태를 code에 담기도 함
+    try:
+        return int(status) in HTTP_RETRYABLE_STATUS
+    except (TypeError, ValueError):
+        return False
+
+def is_unsent_error(e: Exception) -> bool:
+    """요청이 서버에 닿기 전에 실패했는지 (연결 실패/풀 대기 초과는 멱등이 아닌 호출도 다시 보낼 수 있음)"""
+    import httpx
+
+    return isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout))
+
+class CircuitBreaker:
+    """원격 저장소가 연속으로 실패하면 한동안 호출을 바로 거절하는 회로 차단기
+
+    - closed: 정상 호출
+    - open: CIRCUIT_RESET_TIMEOUT 동안 BackendUnavailableError (그동안 화면은 마지막 스냅샷을 사용)
+    - half_open: 시험 호출 하나만 보내고, 성공하면 closed, 실패하면 다시 open
+    """
+
+    def __init__(self):
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = None
+        self.lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self.lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= CIRCUIT_RESET_TIMEOUT:
+                self.state = "half_open"
+                return True
+            return False
+
+    def record_success(self):
+        with self.lock:
+            self.state = "closed"
+            self.failures = 0
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= CIRCUIT_FAILURE_THRESHOLD:
+                if self.state != "open":
+                    logger.warning("원격 저장소 호출이 %d번 연속 실패해 %d초 동안 차단합니다.",
+                                   self.failures, CIRCUIT_RESET_TIMEOUT)
+                    perf.increment("transport.circuit_opened")
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+    def is_degraded(self) -> bool:
+        return self.state != "closed"
+
+@st.cache_resource
+def get_circuit_breaker() -> CircuitBreaker:
+    return CircuitBreaker()
+
+class ResilientRepository:
+    """원격 저장소 호출에 재시도와 회로 차단을 더하는 래퍼
+
+    멱등인 메서드는 일시적인 오류에서 지터를 섞은 지수 백오프로 다시 보내고,
+    insert_problem은 요청이 서버에 닿기 전에 실패한 경우에만 다시 보냅니다.
+    호출/오류/재시도 수는 "transport.*" 카운터로 남습니다. (호출별 소요 시간은 TracedRepository 구간)
+    """
+
+    def __init__(self, repo: Repository, breaker: CircuitBreaker):
+        self.repo = repo
+        self.breaker = breaker
+
+    def __getattr__(self, name):
+        attr = getattr(self.repo, name)
+        if name not in REMOTE_METHODS:
+            return attr
+        idempotent = name in IDEMPOTENT_METHODS
+
+        def call(*args, **kwargs):
+            for attempt in range(HTTP_MAX_ATTEMPTS):
+                if not self.breaker.allow():
+                    perf.increment("transport.rejected")
+                    raise BackendUnavailableError("서버 연결이 불안정해 잠시 요청을 보내지 않습니다. 잠시 후 다시 시도해주세요.")
+                perf.increment("transport.calls")
+                try:
+                    result = attr(*args, **kwargs)
+                except Exception as e:
+                    perf.increment("transport.errors")
+                    if not is_transient_error(e):
+                        self.breaker.record_success()  # 서버는 응답했음 (잘못된 요청 등)
+                        raise
+                    self.breaker.record_failure()
+                    retryable = idempotent or is_unsent_error(e)
+                    if not retryable or attempt + 1 >= HTTP_MAX_ATTEMPTS or self.breaker.state == "open":
+                        raise
+                    delay = random.uniform(0, min(HTTP_RETRY_MAX_DELAY, HTTP_RETRY_BASE_DELAY * (2 ** attempt)))
+                    logger.warning("%s 호출 실패 (%d/%d), %.2f초 후 재시도: %s",
+                                   name, attempt + 1, HTTP_MAX_ATTEMPTS, delay, e)
+                    perf.increment("transport.retries")
+                    time.sleep(delay)
+                else:
+                    self.breaker.record_success()
+                    return result
+
+        return call
+
+@st.cache_resource
+def get_local_replica() -> SQLiteRepository:
+    return SQLiteRepository(LOCAL_REPLICA_PATH)
+
+@st.cache_resource
+def get_replica_listener(table_name: str) -> ReplicaTableListener:
+    return ReplicaTableListener(get_local_replica(), table_name)
+
+@st.cache_resource
+def get_repository() -> Repository:
+    """프로세스 전체에서 함께 쓰는 저장소 (DATA_BACKEND에 따라 선택)"""
+    if DATA_BACKEND == "sqlite":
+        return TracedRepository(SQLiteRepository(SQLITE_DB_PATH, storage_dir=LOCAL_STORAGE_DIR), "sqlite")
+    remote = ResilientRepository(
+        TracedRepository(SupabaseRepository(init_supabase_client(), SUPABASE_URL), "supabase"), get_circuit_breaker()
+    )
+    if USE_LOCAL_REPLICA:
+        return ReplicatedRepository(remote, TracedRepository(get_local_replica(), "replica"))
+    return remote
+
+# --- Storage (파일) 처리 함수 ---
+@st.cache_resource
+def get_storage_executor() -> ThreadPoolExecutor:
+    """이미지 업로드/삭제를 동시에 처리하는 프로세스 공용 작업자 풀"""
+    return ThreadPoolExecutor(max_workers=STORAGE_MAX_WORKERS, thread_name_prefix="storage")
+
+def preprocess_image(bytes_data: bytes):
+    """업로드된 이미지를 실제 형식으로 읽어 크기를 제한하고 WebP로 다시 압축
+
+    (원본, 썸네일) 바이트를 반환합니다. 이미지가 아니면 UnidentifiedImageError가 발생합니다.
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(BytesIO(bytes_data)) as image:
+        image = ImageOps.exif_transpose(image)  # 휴대폰 사진의 회전 정보 반영
+        has_alpha = image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info)
+        image = image.convert("RGBA" if has_alpha else "RGB")
+
+        encoded = []
+        for max_dimension in (IMAGE_MAX_DIMENSION, IMAGE_THUMBNAIL_DIMENSION):
+            resized = image.copy()
+            resized.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
+            buffer = BytesIO()
+            resized.save(buffer, format=IMAGE_FORMAT, quality=IMAGE_QUALITY, method=4)
+            encoded.append(buffer.getvalue())
+    return encoded[0], encoded[1]
+
+@traced
+def upload_image_to_storage(repo: Repository, bucket_name: str, image_file):
+    """이미지를 전처리해 원본과 썸네일을 올리고 ((원본 URL, 썸네일 URL), 오류)를 반환
+
+    파일 이름은 전처리한 이미지 내용의 해시이므로, 같은 이미지는 한 번만 저장됩니다.
+    """
+    from PIL import Image, UnidentifiedImageError
+
     if not image_file: return None, "파일이 없습니다."
     try:
-        bytes_data = image_file.getvalue()
-        file_path = f"{uuid.uuid4().hex}.png"
-        supabase.storage.from_(bucket_name).upload(file=bytes_data, path=file_path, file_options={"content-type": "image/png"})
-        res = supabase.storage.from_(bucket_name).get_public_url(file_path)
-        return res, None
+        image_bytes, thumbnail_bytes = preprocess_image(image_file.getvalue())
+    except Image.DecompressionBombError:
+        # 약 1억 8천만 화소를 넘는 이미지 (고화소 휴대폰 사진 등)는 Pillow가 압축 폭탄으로 보고 거부합니다.
+        return None, f"이미지가 너무 큽니다. ({Image.MAX_IMAGE_PIXELS * 2:,}화소 이하로 줄여서 올려주세요)"
+    except (UnidentifiedImageError, OSError) as e:
+        return None, f"이미지 형식을 확인할 수 없습니다: {e}"
+
+    file_stem = hashlib.sha256(image_bytes).hexdigest()
+    file_path = f"{file_stem}.{IMAGE_EXTENSION}"
+    thumbnail_path = f"{file_stem}_thumb.{IMAGE_EXTENSION}"
+    try:
+        # 같은 경로(=같은 내용)의 파일이 이미 있으면 upload_object가 409 Duplicate를 무시하므로 미리 확인하지 않습니다.
+        repo.upload_object(bucket_name, file_path, image_bytes, IMAGE_CONTENT_TYPE)
+        repo.upload_object(bucket_name, thumbnail_path, thumbnail_bytes, IMAGE_CONTENT_TYPE)
+        return (repo.public_url(bucket_name, file_path), repo.public_url(bucket_name, thumbnail_path)), None
     except Exception as e:
         return None, f"이미지 업로드 오류: {e}"
 
-def delete_image_from_storage(supabase: Client, bucket_name: str, image_url: str):
-    if not image_url or not isinstance(image_url, str): return
-    try:
-        file_path = image_url.split(f'{bucket_name}/')[-1]
-        if file_path:
-            supabase.storage.from_(bucket_name).remove([file_path])
-    except Exception as e:
-        st.warning(f"Storage 파일 삭제 오류 (URL: {image_url}): {e}")
+@traced
+def upload_images_concurrently(repo: Repository, bucket_name: str, image_files: dict):
+    """여러 이미지를 작업자 풀에서 동시에 업로드
+
+    {키: 파일}을 받아 ({키: (원본 URL, 썸네일 URL)}, [오류 메시지])를 반환합니다.
+    하나라도 실패하면 빈 결과를 돌려주므로, DB 저장 전에 오류를 확인하면 됩니다.
+    이미 올라간 파일은 어떤 문제도 참조하지 않으므로 cleanup_images.py가 정리합니다.
+    """
+    executor = get_storage_executor()
+    futures = {
+        key: executor.submit(upload_image_to_storage, repo, bucket_name, image_file)
+        for key, image_file in image_files.items() if image_file
+    }
+    urls, errors = {}, []
+    for key, future in futures.items():
+        try:
+            uploaded_urls, err = future.result()
+        except Exception as e:  # 전처리 중 예상하지 못한 오류도 폼에서 메시지로 보여줍니다.
+            logger.exception("이미지 처리 중 오류: %s", key)
+            uploaded_urls, err = None, f"이미지 처리 오류: {e}"
+        if err:
+            errors.append(err)
+        else:
+            urls[key] = uploaded_urls
+
+    if errors:
+        urls = {}
+    return urls, errors
+
+# --- 프로세스 간 공유 캐시 ---
+# 여러 프로세스(레플리카)가 같은 SQLite 파일을 가리키면 스냅샷과 관리자 목록을 함께 씁니다.
+# 변경분은 한 프로세스만 원격에서 받아 파일에 올리고, 나머지는 파일에서 읽어 갑니다. (비워 두면 사용 안 함)
+SHARED_CACHE_PATH = st.secrets.get("SHARED_CACHE_PATH") or os.getenv("SHARED_CACHE_PATH")
+SHARED_CACHE_LEASE_SECONDS = 30  # 원격 조회를 맡은 프로세스가 멈췄을 때 다른 프로세스가 넘겨받기까지의 시간
+SHARED_CACHE_POLL_INTERVAL = 0.1  # 다른 프로세스의 조회가 끝나기를 기다릴 때 확인 간격(초)
+SHARED_CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS shared_tables (
+    table_name TEXT PRIMARY KEY, version INTEGER NOT NULL DEFAULT 0, high_water_mark TEXT, synced_at REAL,
+    delete_checked_at REAL, invalidated INTEGER NOT NULL DEFAULT 0, lease_holder TEXT, lease_expires REAL
+);
+CREATE TABLE IF NOT EXISTS shared_rows (
+    table_name TEXT, id TEXT, data TEXT, deleted INTEGER NOT NULL DEFAULT 0, version INTEGER,
+    PRIMARY KEY (table_name, id)
+);
+CREATE INDEX IF NOT EXISTS shared_rows_version_idx ON shared_rows (table_name, version);
+CREATE TABLE IF NOT EXISTS shared_values (key TEXT PRIMARY KEY, value TEXT, updated_at REAL);
+"""
+
+class SharedCacheStore:
+    """레플리카들이 함께 쓰는 SQLite 파일에 테이블 스냅샷(버전이 붙은 행)과 관리자 목록을 보관
+
+    - shared_tables.version: 행이 바뀔 때마다 1씩 증가 (다른 프로세스는 이 값만 보고 변경분을 가져감)
+    - shared_tables.invalidated: 누군가 새로 고침을 요청함 (다음 동기화에서 원격 변경분과 삭제분을 확인)
+    - lease_*: 원격 조회를 한 번에 한 프로세스만 하도록 잡는 임대 (만료되면 다른 프로세스가 가져감)
+    """
+
+    def __init__(self, db_path: str):
+        import sqlite3
+
+        self.db_path = db_path
+        self.holder = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.lock = threading.Lock()  # 연결 하나를 세션/작업자 스레드가 함께 씁니다.
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, timeout=10)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SHARED_CACHE_SCHEMA)
+
+    def _query(self, sql: str, params=()) -> list:
+        with self.lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    def _ensure_table(self, table_name: str):
+        with self.lock, self.conn:
+            self.conn.execute("INSERT OR IGNORE INTO shared_tables (table_name) VALUES (?)", (table_name,))
+
+    def state(self, table_name: str) -> dict:
+        self._ensure_table(table_name)
+        return dict(self._query("SELECT * FROM shared_tables WHERE table_name = ?", (table_name,))[0])
+
+    def version(self, table_name: str) -> tuple:
+        """(버전, 새로 고침 요청 여부) - 요청마다 부르므로 행 하나만 읽습니다."""
+        rows = self._query("SELECT version, invalidated FROM shared_tables WHERE table_name = ?", (table_name,))
+        return (rows[0]["version"], bool(rows[0]["invalidated"])) if rows else (0, False)
+
+    def changes_since(self, table_name: str, version: int) -> tuple:
+        """version 이후 바뀐 행과 삭제된 id, 그리고 현재 버전을 (행 목록, id 목록, 버전)으로 반환"""
+        with self.lock:
+            current = self.conn.execute(
+                "SELECT version FROM shared_tables WHERE table_name = ?", (table_name,)
+            ).fetchone()
+            changed = self.conn.execute(
+                "SELECT id, data, deleted FROM shared_rows WHERE table_name = ? AND version > ?", (table_name, version)
+            ).fetchall()
+        rows = [json.loads(row["data"]) for row in changed if not row["deleted"]]
+        deleted_ids = [json.loads(row["id"]) for row in changed if row["deleted"]]
+        return rows, deleted_ids, current["version"] if current else version
+
+    def live_ids(self, table_name: str) -> list:
+        rows = self._query("SELECT id FROM shared_rows WHERE table_name = ? AND deleted = 0", (table_name,))
+        return [json.loads(row["id"]) for row in rows]
+
+    def publish(self, table_name: str, rows=(), deleted_ids=(), high_water_mark: str = None, synced: bool = False,
+                delete_checked: bool = False) -> int:
+        """바뀐 행과 삭제된 id를 새 버전으로 올리고 그 버전을 반환 (synced=True면 원격과 맞춘 시각도 갱신)"""
+        self._ensure_table(table_name)
+        with self.lock, self.conn:
+            version = self.conn.execute(
+                "UPDATE shared_tables SET version = version + 1 WHERE table_name = ? RETURNING version", (table_name,)
+            ).fetchone()["version"]
+            # id는 int/str 구분을 잃지 않도록 JSON으로 저장
+            self.conn.executemany(
+                "INSERT INTO shared_rows (table_name, id, data, deleted, version) VALUES (?, ?, ?, 0, ?) "
+                "ON CONFLICT (table_name, id) DO UPDATE SET data = excluded.data, deleted = 0, version = excluded.version",
+                [(table_name, json.dumps(row["id"]), json.dumps(row, default=str), version) for row in rows],
+            )
+            self.conn.executemany(
+                "UPDATE shared_rows SET deleted = 1, version = ? WHERE table_name = ? AND id = ?",
+                [(version, table_name, json.dumps(row_id)) for row_id in deleted_ids],
+            )
+            now = time.time()
+            if high_water_mark is not None:
+                self.conn.execute(
+                    "UPDATE shared_tables SET high_water_mark = ? WHERE table_name = ?", (high_water_mark, table_name)
+                )
+            if synced:
+                self.conn.execute(
+                    "UPDATE shared_tables SET synced_at = ?, invalidated = 0 WHERE table_name = ?", (now, table_name)
+                )
+            if delete_checked:
+                self.conn.execute(
+                    "UPDATE shared_tables SET delete_checked_at = ? WHERE table_name = ?", (now, table_name)
+                )
+        return version
+
+    def mark_synced(self, table_name: str):
+        """원격에 바뀐 것이 없음을 확인했을 때 (버전은 그대로 두고 확인 시각만 갱신)"""
+        with self.lock, self.conn:
+            self.conn.execute(
+                "UPDATE shared_tables SET synced_at = ?, invalidated = 0 WHERE table_name = ?", (time.time(), table_name)
+            )
+
+    def invalidate(self, table_name: str):
+        self._ensure_table(table_name)
+        with self.lock, self.conn:
+            self.conn.execute("UPDATE shared_tables SET invalidated = 1 WHERE table_name = ?", (table_name,))
+
+    def try_acquire_lease(self, table_name: str) -> bool:
+        """원격 조회 임대를 잡으면 True (다른 프로세스가 유효한 임대를 갖고 있으면 False)"""
+        self._ensure_table(table_name)
+        now = time.time()
+        with self.lock, self.conn:
+            cursor = self.conn.execute(
+                "UPDATE shared_tables SET lease_holder = ?, lease_expires = ? "
+                "WHERE table_name = ? AND (lease_holder IS NULL OR lease_holder = ? OR lease_expires < ?)",
+                (self.holder, now + SHARED_CACHE_LEASE_SECONDS, table_name, self.holder, now),
+            )
+            return cursor.rowcount == 1
+
+    def release_lease(self, table_name: str):
+        with self.lock, self.conn:
+            self.conn.execute(
+                "UPDATE shared_tables SET lease_holder = NULL, lease_expires = NULL "
+                "WHERE table_name = ? AND lease_holder = ?", (table_name, self.holder)
+            )
+
+    def wait_for_sync(self, table_name: str, synced_at: float | None):
+        """다른 프로세스가 원격 조회를 끝낼 때까지 (synced_at이 바뀌거나 임대가 풀릴 때까지) 기다림"""
+        deadline = time.monotonic() + SHARED_CACHE_LEASE_SECONDS
+        while time.monotonic() < deadline:
+            state = self.state(table_name)
+            if state["synced_at"] != synced_at or state["lease_holder"] is None:
+                return
+            time.sleep(SHARED_CACHE_POLL_INTERVAL)
+
+    def get_value(self, key: str):
+        """(값, 저장 시각) - 없으면 (None, None)"""
+        rows = self._query("SELECT value, updated_at FROM shared_values WHERE key = ?", (key,))
+        return (json.loads(rows[0]["value"]), rows[0]["updated_at"]) if rows else (None, None)
+
+    def put_value(self, key: str, value):
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO shared_values (key, value, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at",
+                (key, json.dumps(value), time.time()),
+            )
+
+    def delete_value(self, key: str):
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM shared_values WHERE key = ?", (key,))
+
+@st.cache_resource
+def get_shared_cache() -> SharedCacheStore | None:
+    """SHARED_CACHE_PATH가 설정된 경우 프로세스 간 공유 캐시 (아니면 None)"""
+    return SharedCacheStore(SHARED_CACHE_PATH) if SHARED_CACHE_PATH else None
+
+# --- 테이블 스냅샷 (증분 동기화) ---
+# 테이블별로 변경 여부를 판단할 타임스탬프 컬럼 (supabase/migrations 참고)
+SNAPSHOT_TIMESTAMP_COLUMNS = {"problems": "updated_at", "solutions": "created_at"}
+# 삭제된 행을 감지해야 하는 테이블 (id 목록을 비교해 삭제분을 반영)
+SNAPSHOT_TRACK_DELETES = {"problems": True, "solutions": False}
+# 목록/대시보드에 필요한 컬럼만 스냅샷에 보관합니다. (본문, 보기, 이미지는 상세 화면에서 id로 조회)
+PROBLEM_INDEX_COLUMNS = [
+    "id", "title", "category", "chapter", "difficulty", "question_type", "creator_name", "creator_email",
+    "created_at", "updated_at",
+]
+# 스냅샷에 보관할 컬럼 (None이면 전체)
+SNAPSHOT_COLUMNS = {"problems": PROBLEM_INDEX_COLUMNS, "solutions": None}
+# 로컬 복제본도 같은 컬럼만 받고, 문제 전체 행은 상세 화면에서 처음 조회할 때 채웁니다. (ReplicatedRepository)
+REPLICATE_TO_LOCAL = DATA_BACKEND == "supabase" and USE_LOCAL_REPLICA
+# 함께 조회해 리스너(검색 색인, 복제본 등)에만 전달하고 스냅샷에는 보관하지 않는 컬럼 (None이면 전체)
+SNAPSHOT_LISTENER_COLUMNS = {"problems": ["question", "explanation"], "solutions": []}
+SNAPSHOT_SYNC_INTERVAL = 30  # 변경 피드가 없을 때 변경 여부를 확인하는 간격(초)
+SNAPSHOT_FEED_RESYNC_INTERVAL = 600  # 변경 피드가 연결돼 있어도 놓친 이벤트가 없는지 확인하는 간격(초)
+SNAPSHOT_DELETE_CHECK_INTERVAL = 300  # 삭제분 확인 간격(초)
+SNAPSHOT_SYNC_OVERLAP = pd.Timedelta(seconds=5)  # 커밋 지연으로 누락되는 행이 없도록 겹쳐서 조회
+
+class TableSnapshot:
+    """테이블 전체를 프로세스 메모리에 보관하고 변경된 행만 반영하는 스냅샷"""
+
+    def __init__(self, table_name: str, shared_store: SharedCacheStore | None = None):
+        self.table_name = table_name
+        self.shared_store = shared_store
+        self.shared_version = 0  # 공유 캐시에서 마지막으로 반영한 버전
+        self.change_feed = None  # 연결돼 있으면 행 변경을 바로 받으므로 주기적인 확인을 줄입니다.
+        self.change_marker = None  # 마지막 동기화 때 확인한 (최대 타임스탬프, 행 수)
+        self.timestamp_column = SNAPSHOT_TIMESTAMP_COLUMNS[table_name]
+        self.track_deletes = SNAPSHOT_TRACK_DELETES[table_name]
+        self.columns = SNAPSHOT_COLUMNS[table_name]
+        listener_columns = SNAPSHOT_LISTENER_COLUMNS[table_name]
+        if self.columns is None or listener_columns is None:
+            self.select_columns = "*"
+        else:
+            self.select_columns = ",".join(self.columns + listener_columns)
+        self.rows = {}  # id -> 행(dict)
+        self.high_water_mark = None  # 지금까지 받은 가장 최근 타임스탬프
+        self.version = 0
+        self.last_synced = None
+        self.last_delete_check = None
+        self.invalidated = False
+        self.refreshing = False
+        self.lock = threading.RLock()  # 행/DataFrame 접근용 (짧게만 잡음)
+        self.sync_lock = threading.Lock()  # DB 조회는 한 번에 하나만 (single-flight)
+        self.listeners = []  # 행 변경을 전달받는 보조 인덱스들
+        self._frame = pd.DataFrame()
+        self._frame_version = 0
+
+    def ensure_fresh(self, repo: Repository):
+        """스냅샷이 비어 있으면 채울 때까지 기다리고, 오래됐으면 지금 스냅샷을 그대로 쓰면서 백그라운드에서 갱신
+
+        동시에 들어온 세션들은 sync_lock에서 한 번의 조회를 함께 기다리므로 같은 테이블을 여러 번 읽지 않습니다.
+        """
+        if self.shared_store is not None and self.last_synced is not None:
+            # 다른 프로세스가 올린 변경분(저장/삭제/동기화)은 원격 조회 없이 공유 캐시에서 바로 가져옵니다.
+            shared_version, shared_invalidated = self.shared_store.version(self.table_name)
+            if shared_version > self.shared_version:
+                perf.increment(f"cache.shared.{self.table_name}.pull")
+                self.pull_shared()
+            self.invalidated = self.invalidated or shared_invalidated
+        live_feed = self.change_feed is not None and self.change_feed.live
+        sync_interval = SNAPSHOT_FEED_RESYNC_INTERVAL if live_feed else SNAPSHOT_SYNC_INTERVAL
+        if self.last_synced is None:
+            perf.increment(f"cache.snapshot.{self.table_name}.miss")
+            self.sync(repo)
+        elif self.invalidated or time.monotonic() - self.last_synced >= sync_interval:
+            perf.increment(f"cache.snapshot.{self.table_name}.stale")
+            self.refresh_in_background(repo)
+        else:
+            perf.increment(f"cache.snapshot.{self.table_name}.hit")
+
+    def sync(self, repo: Repository, force: bool = False):
+        """마지막 동기화 이후 바뀐 행만 가져와 스냅샷에 반영
+
+        DB 조회는 스냅샷 잠금(lock) 밖에서 하므로, 갱신하는 동안에도 다른 세션은 기존 스냅샷을 읽을 수 있습니다.
+        """
+        with self.sync_lock:
+            now = time.monotonic()
+            force = force or self.invalidated
+            if not force and self.last_synced is not None and now - self.last_synced < SNAPSHOT_SYNC_INTERVAL:
+                return  # 기다리는 동안 다른 세션이 이미 갱신함
+            self.invalidated = False
+            if self.shared_store is not None:
+                self.sync_shared(repo, force)
+                self.last_synced = now
+                return
+
+            # 최대 타임스탬프와 행 수가 그대로면 변경분 조회를 건너뜁니다. (처음에는 전체 조회 결과로 기준을 정함)
+            marker = None
+            if self.last_synced is not None:
+                marker = self.probe_changes(repo)
+                if not force and marker == self.change_marker:
+                    perf.increment(f"cache.snapshot.{self.table_name}.unchanged")
+                    self.last_synced = now
+                    return
+
+            since = None
+            if self.high_water_mark is not None:
+                since = (pd.Timestamp(self.high_water_mark) - SNAPSHOT_SYNC_OVERLAP).isoformat()
+            changed = repo.fetch_rows(self.table_name, self.select_columns, self.timestamp_column, since)
+            self.apply_upserts(changed)
+            timestamps = [row[self.timestamp_column] for row in changed if row.get(self.timestamp_column)]
+            if timestamps:
+                latest = max(timestamps, key=pd.Timestamp)
+                if self.high_water_mark is None or pd.Timestamp(latest) > pd.Timestamp(self.high_water_mark):
+                    self.high_water_mark = latest
+
+            # 초기 로딩 직후에는 전체 id를 이미 알고 있으므로 삭제 확인을 건너뜁니다.
+            # 원격 행 수가 스냅샷보다 적으면 삭제된 행이 있으므로 바로 확인합니다.
+            if marker is None:
+                marker = (self.high_water_mark, len(self.rows) if self.track_deletes else None)
+                self.last_delete_check = now
+            elif self.track_deletes and (force or now - self.last_delete_check >= SNAPSHOT_DELETE_CHECK_INTERVAL
+                                         or len(self.rows) > marker[1]):
+                with self.lock:
+                    known_ids = list(self.rows)  # 조회 중에 이 프로세스가 새로 저장한 행은 비교하지 않음
+                remote_ids = repo.fetch_ids(self.table_name)
+                self.apply_deletes([row_id for row_id in known_ids if row_id not in remote_ids])
+                self.last_delete_check = now
+            self.change_marker = marker
+            self.last_synced = now
+
+    def probe_changes(self, repo: Repository) -> tuple:
+        """원격 테이블의 (최대 타임스탬프, 행 수) - 삭제를 추적하지 않는 테이블은 행 수를 세지 않음"""
+        return tuple(repo.fetch_change_marker(self.table_name, self.timestamp_column, self.track_deletes))
+
+    def sync_shared(self, repo: Repository, force: bool):
+        """공유 캐시를 거쳐 동기화 (sync_lock을 잡은 상태에서 호출)
+
+        다른 프로세스가 최근에 원격과 맞췄으면 공유 캐시의 변경분만 읽고, 아니면 임대를 잡은 프로세스 하나만
+        원격에서 변경분(과 삭제분)을 받아 공유 캐시에 올립니다. 임대를 못 잡은 프로세스는 그 결과를 기다립니다.
+        """
+        store = self.shared_store
+        if force:
+            store.invalidate(self.table_name)
+        state = store.state(self.table_name)
+        if not self._shared_is_fresh(state):
+            if store.try_acquire_lease(self.table_name):
+                try:
+                    state = store.state(self.table_name)  # 임대를 기다리는 동안 다른 프로세스가 맞췄을 수 있음
+                    if not self._shared_is_fresh(state):
+                        perf.increment(f"cache.shared.{self.table_name}.fetch")
+                        self._fetch_into_shared(repo, state)
+                finally:
+                    store.release_lease(self.table_name)
+            else:
+                perf.increment(f"cache.shared.{self.table_name}.wait")
+                store.wait_for_sync(self.table_name, state["synced_at"])
+        self.pull_shared()
+
+    def _shared_is_fresh(self, state: dict) -> bool:
+        return (not state["invalidated"] and state["synced_at"] is not None
+                and time.time() - state["synced_at"] < SNAPSHOT_SYNC_INTERVAL)
+
+    def _fetch_into_shared(self, repo: Repository, state: dict):
+        """원격에서 공유 캐시의 기준 시각 이후 변경분(과 필요하면 삭제분)을 받아 공유 캐시에 올림"""
+        marker_key = f"change_marker:{self.table_name}"
+        marker = None
+        if state["high_water_mark"] is not None:
+            marker = self.probe_changes(repo)
+            previous_marker, _ = self.shared_store.get_value(marker_key)
+            if not state["invalidated"] and previous_marker == list(marker):
+                perf.increment(f"cache.snapshot.{self.table_name}.unchanged")
+                self.shared_store.mark_synced(self.table_name)
+                return
+
+        since = None
+        if state["high_water_mark"] is not None:
+            since = (pd.Timestamp(state["high_water_mark"]) - SNAPSHOT_SYNC_OVERLAP).isoformat()
+        changed = repo.fetch_rows(self.table_name, self.select_columns, self.timestamp_column, since)
+        high_water_mark = state["high_water_mark"]
+        timestamps = [row[self.timestamp_column] for row in changed if row.get(self.timestamp_column)]
+        if timestamps:
+            latest = max(timestamps, key=pd.Timestamp)
+            if high_water_mark is None or pd.Timestamp(latest) > pd.Timestamp(high_water_mark):
+                high_water_mark = latest
+
+        # 처음 채울 때는 전체를 받았으므로 삭제 확인을 건너뜁니다.
+        deleted_ids, delete_checked = [], marker is None
+        if marker is None:
+            marker = (high_water_mark, len(changed) if self.track_deletes else None)
+        known_ids = self.shared_store.live_ids(self.table_name) if self.track_deletes else []
+        if self.track_deletes and not delete_checked and (
+            state["invalidated"] or state["delete_checked_at"] is None
+            or time.time() - state["delete_checked_at"] >= SNAPSHOT_DELETE_CHECK_INTERVAL
+            or len(set(known_ids).union(row["id"] for row in changed)) > marker[1]
+        ):
+            remote_ids = repo.fetch_ids(self.table_name)
+            deleted_ids = [row_id for row_id in known_ids if row_id not in remote_ids]
+            delete_checked = True
+        self.shared_store.publish(self.table_name, changed, deleted_ids, high_water_mark, synced=True,
+                                  delete_checked=delete_checked)
+        self.shared_store.put_value(marker_key, list(marker))
+
+    def pull_shared(self):
+        """공유 캐시에서 마지막으로 반영한 버전 이후의 변경분을 스냅샷에 반영"""
+        rows, deleted_ids, version = self.shared_store.changes_since(self.table_name, self.shared_version)
+        self.apply_upserts(rows)
+        self.apply_deletes(deleted_ids)
+        self.shared_version = version
+
+    def record_upserts(self, rows):
+        """이 프로세스가 저장한 행을 스냅샷에 반영하고 다른 프로세스에도 공유 캐시로 알림"""
+        self.apply_upserts(rows)
+        if self.shared_store is not None and rows:
+            self._advance_shared_version(self.shared_store.publish(self.table_name, rows))
+
+    def record_deletes(self, ids):
+        """이 프로세스가 삭제한 행을 스냅샷에서 빼고 다른 프로세스에도 공유 캐시로 알림"""
+        self.apply_deletes(ids)
+        if self.shared_store is not None and ids:
+            self._advance_shared_version(self.shared_store.publish(self.table_name, deleted_ids=ids))
+
+    def _advance_shared_version(self, version: int):
+        """방금 올린 버전이 바로 다음 버전이면 (사이에 다른 프로세스의 변경이 없으면) 다시 받지 않도록 표시"""
+        with self.lock:
+            if version == self.shared_version + 1:
+                self.shared_version = version
+
+    def refresh_in_background(self, repo: Repository):
+        """이미 갱신 중이 아니면 백그라운드 스레드에서 sync를 실행"""
+        with self.lock:
+            if self.refreshing:
+                return
+            self.refreshing = True
+
+        def _refresh():
+            try:
+                self.sync(repo)
+            except Exception as e:
+                # 다음 요청에서 다시 시도하며, 그동안은 기존 스냅샷을 사용합니다.
+                logger.warning("%s 스냅샷 갱신 실패: %s", self.table_name, e)
+            finally:
+                self.refreshing = False
+
+        threading.Thread(target=_refresh, name=f"snapshot-refresh-{self.table_name}", daemon=True).start()
+
+    def invalidate(self):
+        """다음 요청에서 변경분과 삭제분을 다시 확인하도록 표시 (다른 테이블의 스냅샷은 그대로)"""
+        self.invalidated = True
+
+    def mark_stale(self):
+        """다음 요청에서 변경 여부를 확인하도록 표시 (변경 피드가 끊겼다 다시 연결돼 놓친 이벤트가 있을 수 있을 때)"""
+        if self.last_synced is not None:
+            self.last_synced = float("-inf")
+
+    def apply_change(self, event_type: str, record: dict | None, old_record: dict | None):
+        """변경 피드로 받은 행 하나의 INSERT/UPDATE/DELETE를 스냅샷에 반영"""
+        if event_type == "DELETE":
+            if old_record and old_record.get("id") is not None:
+                self.apply_deletes([old_record["id"]])
+        elif record:
+            self.apply_upserts([record])
+
+    def apply_upserts(self, rows):
+        """새로 생기거나 수정된 행을 스냅샷에 반영"""
+        if not rows:
+            return
+        with self.lock:
+            for row in rows:
+                if self.columns is not None:
+                    row = {column: row[column] for column in self.columns if column in row}
+                self.rows[row["id"]] = {**self.rows.get(row["id"], {}), **row}
+            # 리스너에는 보관하지 않는 컬럼까지 포함된 원래 행을 전달
+            for listener in self.listeners:
+                listener.upsert(rows)
+            self.version += 1
+
+    def apply_deletes(self, ids):
+        """삭제된 행을 스냅샷에서 제거"""
+        with self.lock:
+            removed = [row_id for row_id in ids if self.rows.pop(row_id, None) is not None]
+            if removed:
+                for listener in self.listeners:
+                    listener.delete(removed)
+                self.version += 1
+
+    def add_listener(self, listener):
+        """행 변경(upsert/delete)을 전달받을 객체를 등록 (스냅샷을 처음 채우기 전에 등록해야 함)"""
+        with self.lock:
+            self.listeners.append(listener)
+
+    def frame(self) -> pd.DataFrame:
+        """현재 스냅샷을 DataFrame으로 반환 (버전이 바뀔 때만 다시 만듭니다)
+
+        반환된 DataFrame은 st.cache_resource로 모든 세션이 복사 없이 공유하므로
+        호출하는 쪽에서 수정하면 안 됩니다.
+        """
+        with self.lock:
+            if self._frame_version != self.version:
+                perf.increment(f"cache.frame.{self.table_name}.miss")
+                df = self._build_frame()
+                if "created_at" in df.columns:
+                    df = df.sort_values(by="created_at", ascending=False, ignore_index=True)
+                # 목록 화면의 순서로 미리 정렬해 두어, 화면은 다시 정렬하지 않고 필터링/슬라이싱만 합니다.
+                sort_column = SNAPSHOT_FRAME_SORT_COLUMNS.get(self.table_name)
+                if sort_column in df.columns:
+                    df = df.iloc[np.argsort(df[sort_column].to_numpy(), kind="stable")].reset_index(drop=True)
+                self._frame = df
+                self._frame_version = self.version
+            return self._frame
+
+    def _build_frame(self, compact: bool = True) -> pd.DataFrame:
+        df = pd.DataFrame(list(self.rows.values()))
+        prepare = SNAPSHOT_FRAME_PREPARERS.get(self.table_name)
+        if compact and prepare is not None and not df.empty:
+            df = prepare(df)
+        return df
+
+    def memory_report(self) -> dict:
+        """스냅샷을 그대로 DataFrame으로 만들었을 때와 압축했을 때의 행당 메모리(bytes) 비교"""
+        with self.lock:
+            raw_df = self._build_frame(compact=False)
+        compact_df = self.frame()
+        row_count = max(len(compact_df), 1)
+        before = int(raw_df.memory_usage(deep=True).sum())
+        after = int(compact_df.memory_usage(deep=True).sum())
+        return {
+            "table": self.table_name,
+            "rows": len(compact_df),
+            "bytes_per_row_before": before / row_count,
+            "bytes_per_row_after": after / row_count,
+            "total_bytes_before": before,
+            "total_bytes_after": after,
+        }
+
+# --- 변경 피드 ---
+# - "realtime": Supabase Realtime(postgres_changes)으로 행 변경을 받아 바로 반영 (Supabase 기본값)
+# - "poll": SNAPSHOT_SYNC_INTERVAL마다 (최대 타임스탬프, 행 수)만 확인하고 바뀐 경우에만 변경분 조회 (SQLite 기본값)
+# - "local": 같은 프로세스에서 publish()로 직접 발행 (테스트/벤치마크용)
+CHANGE_FEED = st.secrets.get("CHANGE_FEED") or os.getenv(
+    "CHANGE_FEED", "realtime" if DATA_BACKEND == "supabase" else "poll"
+)
+CHANGE_FEED_TABLES = ["problems", "solutions"]
+CHANGE_FEED_RETRY_DELAY = 5  # 구독이 끊겼을 때 다시 연결하기까지의 대기 시간(초), 실패할 때마다 두 배
+CHANGE_FEED_MAX_RETRY_DELAY = 300
+
+class ChangeFeed:
+    """테이블 행 변경(INSERT/UPDATE/DELETE)을 구독한 스냅샷에 전달하는 변경 피드
+
+    live가 True인 동안 스냅샷은 주기적인 확인 간격을 SNAPSHOT_FEED_RESYNC_INTERVAL로 늘립니다.
+    """
+
+    def __init__(self):
+        self.snapshots = {}  # 테이블 이름 -> TableSnapshot
+        self.live = False
+
+    def subscribe(self, snapshot: TableSnapshot):
+        self.snapshots[snapshot.table_name] = snapshot
+        snapshot.change_feed = self
+
+    def dispatch(self, table_name: str, event_type: str, record: dict | None, old_record: dict | None):
+        snapshot = self.snapshots.get(table_name)
+        if snapshot is None or snapshot.last_synced is None:
+            return  # 아직 채우지 않은 스냅샷은 처음 동기화할 때 전체를 받음
+        perf.increment(f"feed.{table_name}.{event_type.lower()}")
+        snapshot.apply_change(event_type, record, old_record)
+
+    def set_live(self, live: bool):
+        if live and not self.live:
+            # 연결이 끊긴 동안 놓친 변경이 있을 수 있으므로 한 번은 변경 여부를 확인합니다.
+            for snapshot in self.snapshots.values():
+                snapshot.mark_stale()
+        self.live = live
+
+class LocalChangeFeed(ChangeFeed):
+    """같은 프로세스 안에서 publish()로 변경을 발행하는 변경 피드 (Realtime 대신 테스트/벤치마크에서 사용)"""
+
+    def __init__(self):
+        super().__init__()
+        self.live = True
+
+    def publish(self, table_name: str, event_type: str, record: dict = None, old_record: dict = None):
+        self.dispatch(table_name, event_type, record, old_record)
+
+class RealtimeChangeFeed(ChangeFeed):
+    """Supabase Realtime의 postgres_changes를 백그라운드 스레드의 asyncio 루프에서 구독하는 변경 피드
+
+    구독이 끊기면 live를 내리고 (그동안 스냅샷은 "poll" 방식으로 확인) 지수 백오프로 다시 연결합니다.
+    """
+
+    def __init__(self, url: str, key: str, tables: list):
+        super().__init__()
+        self.url = url
+        self.key = key
+        self.tables = tables
+        self.thread = threading.Thread(target=self._run_forever, name="change-feed", daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def _run_forever(self):
+        import asyncio
+
+        asyncio.run(self._run())
+
+    async def _run(self):
+        import asyncio
+        from realtime import AsyncRealtimeClient, RealtimeSubscribeStates
+
+        delay = CHANGE_FEED_RETRY_DELAY
+        while True:
+            client = None
+            try:
+                # 라이브러리가 스스로 다시 연결하면 그동안 놓친 변경을 알 수 없으므로 재연결은 여기서만 합니다.
+                client = AsyncRealtimeClient(f"{self.url.rstrip('/')}/realtime/v1", self.key, auto_reconnect=False)
+                channel = client.channel("study-inside-snapshots")
+                for table_name in self.tables:
+                    channel.on_postgres_changes("*", callback=self._on_change, table=table_name, schema="public")
+                closed = asyncio.Event()
+
+                def on_state(state, error, closed=closed):
+                    if state == RealtimeSubscribeStates.SUBSCRIBED:
+                        logger.info("변경 피드 구독 시작: %s", ", ".join(self.tables))
+                        self.set_live(True)
+                    else:
+                        logger.warning("변경 피드 구독 중단 (%s): %s", state, error)
+                        self.set_live(False)
+                        closed.set()
+
+                await channel.subscribe(on_state)
+                await self._wait_until_closed(client, closed)
+                if not closed.is_set():
+                    logger.warning("변경 피드 연결이 끊겼습니다.")
+                self.set_live(False)
+                delay = CHANGE_FEED_RETRY_DELAY  # 한 번 연결됐다 끊긴 경우는 처음 간격부터 다시 시도
+            except Exception as e:
+                logger.warning("변경 피드에 연결하지 못했습니다: %s", e)
+                self.set_live(False)
+            finally:
+                if client is not None:
+                    try:
+                        await client.close()
+                    except Exception:
+                        pass
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, CHANGE_FEED_MAX_RETRY_DELAY)
+
+    @staticmethod
+    async def _wait_until_closed(client, closed):
+        """구독이 중단되거나 소켓 수신이 끝날 때까지 대기
+
+        소켓이 끊기면 라이브러리는 구독 상태 콜백을 부르지 않으므로 수신 태스크가 끝나는 것도 함께 봅니다.
+        """
+        import asyncio
+
+        waiters = [asyncio.ensure_future(closed.wait())]
+        if client._listen_task is not None:
+            waiters.append(client._listen_task)
+        try:
+            await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            waiters[0].cancel()
+
+    def _on_change(self, payload):
+        data = payload["data"]
+        try:
+            self.dispatch(data["table"], data["type"], data.get("record"), data.get("old_record"))
+        except Exception as e:
+            logger.warning("변경 이벤트를 반영하지 못했습니다 (%s %s): %s", data.get("type"), data.get("table"), e)
+
+@st.cache_resource
+def get_change_feed() -> ChangeFeed | None:
+    """CHANGE_FEED 설정에 따른 프로세스 공용 변경 피드 ("poll"이면 None)"""
+    if CHANGE_FEED == "local":
+        return LocalChangeFeed()
+    if CHANGE_FEED == "realtime" and DATA_BACKEND == "supabase" and SUPABASE_URL and SUPABASE_KEY:
+        feed = RealtimeChangeFeed(SUPABASE_URL, SUPABASE_KEY, CHANGE_FEED_TABLES)
+        feed.start()
+        return feed
+    return None
 
-# --- Supabase DB (데이터) 처리 함수 ---
-@st.cache_data(ttl=300)
-def load_data_from_db(_supabase: Client, table_name: str):
+@st.cache_resource
+def get_table_snapshot(table_name: str) -> TableSnapshot:
+    """프로세스 전체에서 공유하는 테이블 스냅샷"""
+    snapshot = TableSnapshot(table_name, get_shared_cache())
+    for get_listener in SNAPSHOT_LISTENERS.get(table_name, []):
+        snapshot.add_listener(get_listener())
+    feed = get_change_feed()
+    if feed is not None and table_name in CHANGE_FEED_TABLES:
+        feed.subscribe(snapshot)
+    return snapshot
+
+# --- DB (데이터) 처리 함수 ---
+@traced
+def sync_table(repo: Repository, table_name: str) -> TableSnapshot:
+    """스냅샷이 최신인지 확인하고 필요하면 변경분을 반영 (DataFrame은 만들지 않음)"""
+    snapshot = get_table_snapshot(table_name)
     try:
-        response = _supabase.table(table_name).select("*").order("created_at", desc=True).execute()
-        return pd.DataFrame(response.data)
+        snapshot.ensure_fresh(repo)
     except Exception as e:
         st.error(f"{table_name} 데이터 로딩 오류: {e}")
-        return pd.DataFrame()
+    return snapshot
+
+def invalidate_table_snapshot(table_name: str):
+    """한 테이블의 스냅샷만 다음 요청에서 다시 확인하도록 표시"""
+    get_table_snapshot(table_name).invalidate()
+
+@traced
+def load_data_from_db(repo: Repository, table_name: str):
+    return sync_table(repo, table_name).frame()
+
+def load_solved_problem_ids(repo: Repository, user_email: str) -> frozenset:
+    """사용자가 이미 푼 문제 id 집합 (solutions 스냅샷의 풀이 색인 사용)"""
+    sync_table(repo, "solutions")
+    return get_solved_set_index().solved_by(user_email)
+
+# --- 풀이 기록 쓰기 큐 (write-behind) ---
+SOLUTION_BATCH_SIZE = 50  # 한 번에 insert할 최대 풀이 기록 수
+SOLUTION_FLUSH_INTERVAL = 2.0  # 첫 기록이 들어온 뒤 이 시간(초) 안에 모아서 저장
+SOLUTION_RETRY_BASE_DELAY = 0.5  # 재시도 대기 시간의 기준값(초), 시도마다 두 배
+SOLUTION_RETRY_MAX_DELAY = 30  # 재시도 대기 시간의 상한 (회로 차단기가 다시 시험 호출을 보내는 간격과 같음)
+
+class SolutionWriteQueue:
+    """풀이 기록을 모아 여러 행을 한 번에 저장하는 프로세스 공용 write-behind 큐
+
+    제출은 큐에 넣는 즉시 끝나고, 백그라운드 스레드가 개수/시간 기준으로 묶어서 저장합니다.
+    (problem_id, user_email)이 같은 행은 무시하므로 재시도해도 같은 기록이 두 번 저장되지 않습니다.
+    연결 오류나 회로 차단처럼 일시적인 실패는 저장될 때까지 큐에 남겨 두고 다시 시도하며,
+    DB가 거절한 행(삭제된 문제 등)만 스냅샷과 색인에서 되돌린 뒤 다음 화면에서 사용자에게 알립니다.
+    """
+
+    def __init__(self, repo: Repository, snapshot: TableSnapshot):
+        self.repo = repo
+        self.snapshot = snapshot
+        self.pending = []
+        self.failed = defaultdict(list)  # 이메일 -> 저장하지 못하고 되돌린 풀이 기록 (사용자에게 알리기 전)
+        self.condition = threading.Condition()
+        self.stopped = False
+        self.thread = threading.Thread(target=self._run, name="solution-writer", daemon=True)
+        self.thread.start()
+        atexit.register(self.close)  # 서버 종료 시 남은 기록 저장
+
+    def enqueue(self, row: dict):
+        with self.condition:
+            self.pending.append(row)
+            self.condition.notify()
+
+    def take_failures(self, user_email: str) -> list:
+        """사용자의 저장하지 못한 풀이 기록을 꺼냄 (한 번만 알리도록 비움)"""
+        with self.condition:
+            return self.failed.pop(user_email, [])
+
+    def close(self):
+        with self.condition:
+            self.stopped = True
+            self.condition.notify()
+        self.thread.join(timeout=30)
+
+    def _run(self):
+        failures = 0  # 연속으로 일시적인 오류가 난 횟수 (대기 시간 계산용)
+        while True:
+            with self.condition:
+                while not self.pending and not self.stopped:
+                    self.condition.wait()
+                if not self.pending:
+                    return  # 종료 요청 + 남은 기록 없음
+
+                # 묶음이 찰 때까지 또는 FLUSH_INTERVAL 동안 더 기다림
+                deadline = time.monotonic() + SOLUTION_FLUSH_INTERVAL
+                while len(self.pending) < SOLUTION_BATCH_SIZE and not self.stopped:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self.condition.wait(remaining)
+                batch = self.pending[:SOLUTION_BATCH_SIZE]
+                del self.pending[:SOLUTION_BATCH_SIZE]
+
+            unsaved = self._write(batch)
+            if not unsaved:
+                failures = 0
+                continue
+
+            # 저장하지 못한 행은 큐 앞에 되돌려 두고 기다렸다가 다시 시도합니다.
+            failures += 1
+            delay = min(SOLUTION_RETRY_MAX_DELAY, SOLUTION_RETRY_BASE_DELAY * (2 ** (failures - 1)))
+            delay *= random.uniform(0.5, 1.5)
+            with self.condition:
+                self.pending[:0] = unsaved
+                if self.stopped:
+                    logger.error("서버 종료 중이라 풀이 기록 %d건을 저장하지 못했습니다: %s", len(self.pending), self.pending)
+                    return
+                logger.warning("풀이 기록 %d건을 저장하지 못해 %.1f초 후 다시 시도합니다. (대기 %d건)",
+                               len(unsaved), delay, len(self.pending))
+                deadline = time.monotonic() + delay
+                while not self.stopped and (remaining := deadline - time.monotonic()) > 0:
+                    self.condition.wait(remaining)
+
+    def _write(self, batch) -> list:
+        """묶음을 저장하고 일시적인 오류로 저장하지 못한 행 목록을 반환 (모두 저장했으면 빈 목록)"""
+        try:
+            self.repo.insert_solutions(batch)
+            return []
+        except Exception as e:
+            if is_retryable_write_error(e):
+                logger.warning("풀이 기록 %d건 저장 실패: %s", len(batch), e)
+                return batch
+            logger.warning("풀이 기록 %d건을 한 번에 저장하지 못해 한 건씩 다시 저장합니다: %s", len(batch), e)
+
+        # DB가 묶음을 거절하면 문제가 있는 행만 골라내도록 한 건씩 저장합니다.
+        for index, row in enumerate(batch):
+            try:
+                self.repo.insert_solutions([row])
+            except Exception as e:
+                if is_retryable_write_error(e):
+                    return batch[index:]
+                self._abandon(row, e)
+        return []
+
+    def _abandon(self, row: dict, error: Exception):
+        """DB가 거절한 풀이 기록을 스냅샷(과 푼 문제 색인, 대시보드 집계, 공유 캐시)에서 되돌림"""
+        logger.error("풀이 기록을 저장할 수 없어 되돌립니다: %s (%s)", row, error)
+        perf.increment("solution_queue.abandoned")
+        self.snapshot.record_deletes([row["id"]])
+        with self.condition:
+            self.failed[row["user_email"]].append(row)
+
+def is_retryable_write_error(e: Exception) -> bool:
+    """다시 보내면 저장될 수 있는 오류인지 (연결/시간 초과, 5xx, 회로 차단)"""
+    return isinstance(e, BackendUnavailableError) or is_transient_error(e)
+
+@st.cache_resource
+def get_solution_write_queue(_repo: Repository) -> SolutionWriteQueue:
+    return SolutionWriteQueue(_repo, get_table_snapshot("solutions"))
+
+def save_solution_to_db(repo: Repository, solution_data: dict):
+    """풀이 기록을 쓰기 큐에 넣고 스냅샷에 바로 반영 (DB 저장은 백그라운드에서 묶어서 처리)
 
-def save_solution_to_db(supabase: Client, solution_data: dict):
+    이미 푼 문제라면 저장하지 않으므로 (problem_id, user_email)마다 기록은 하나만 남습니다.
+    """
     try:
-        supabase.table("solutions").insert(solution_data).execute()
-        st.cache_data.clear()
+        if solution_data["problem_id"] in load_solved_problem_ids(repo, solution_data["user_email"]):
+            return
+        # solutions.id(uuid)를 미리 정해 두면 재시도와 이후 동기화에서 같은 행으로 취급됩니다.
+        # created_at은 DB가 저장 시각으로 채우도록 보내지 않습니다. (변경분 조회 기준)
+        row = {**solution_data, "id": str(uuid.uuid4())}
+        get_solution_write_queue(repo).enqueue(row)
+        get_table_snapshot("solutions").record_upserts([{**row, "created_at": datetime.now(timezone.utc).isoformat()}])
     except Exception as e:
         st.error(f"풀이 기록 저장 오류: {e}")
 
-def save_problem_to_db(supabase: Client, problem_data: dict):
+def save_problem_to_db(repo: Repository, problem_data: dict):
     try:
-        supabase.table("problems").insert(problem_data).execute()
-        st.cache_data.clear()
+        get_table_snapshot("problems").record_upserts(repo.insert_problem(problem_data))
     except Exception as e:
         st.error(f"문제 저장 오류: {e}")
 
-def delete_problem_from_db(supabase: Client, problem: dict):
+def delete_problem_from_db(repo: Repository, problem: dict):
     try:
-        delete_image_from_storage(supabase, SUPABASE_BUCKET_NAME, problem.get('question_image_url'))
-        delete_image_from_storage(supabase, SUPABASE_BUCKET_NAME, problem.get('explanation_image_url'))
-        supabase.table("problems").delete().eq("id", problem["id"]).execute()
-        st.cache_data.clear()
+        repo.delete_problem(problem["id"])
+        get_table_snapshot("problems").record_deletes([problem["id"]])
+        # 더 이상 참조되지 않는 이미지는 cleanup_images.py가 모아서 삭제합니다.
     except Exception as e:
         st.error(f"문제 삭제 오류: {e}")
 
-def update_problem_in_db(supabase: Client, problem_id: int, new_data: dict, old_problem: dict):
-    """Supabase의 problems 테이블에서 특정 문제를 업데이트합니다."""
+def update_problem_in_db(repo: Repository, problem_id: int, new_data: dict):
+    """problems 테이블에서 특정 문제를 업데이트합니다."""
     try:
-        # 새 이미지 파일이 있으면 기존 이미지 삭제 후 새 이미지 업로드
-        if new_data.get("question_image_url") != old_problem.get("question_image_url"):
-            delete_image_from_storage(supabase, SUPABASE_BUCKET_NAME, old_problem.get("question_image_url"))
-        
-        if new_data.get("explanation_image_url") != old_problem.get("explanation_image_url"):
-            delete_image_from_storage(supabase, SUPABASE_BUCKET_NAME, old_problem.get("explanation_image_url"))
-
-        supabase.table("problems").update(new_data).eq("id", problem_id).execute()
-        st.cache_data.clear()
+        get_table_snapshot("problems").record_upserts(repo.update_problem(problem_id, new_data))
+        # 교체된 기존 이미지는 cleanup_images.py가 모아서 삭제합니다.
     except Exception as e:
         st.error(f"문제 업데이트 오류: {e}")
 
 # --- 한글 초성 정렬 함수 ---
-def korean_sort_key(s):
+CHOSUNG_LIST = ['ㄱ', 'ㄲ', 'ㄴ', 'ㄷ', 'ㄸ', 'ㄹ', 'ㅁ', 'ㅂ', 'ㅃ', 'ㅅ', 'ㅆ', 'ㅇ', 'ㅈ', 'ㅉ', 'ㅊ', 'ㅋ', 'ㅌ', 'ㅍ', 'ㅎ']
+SORT_KEY_MAX_CHARS = 64  # 정렬 키에 반영할 최대 글자 수
+_SORT_GROUP_SPAN = 0x110000  # 유니코드 코드 포인트 개수 (그룹 간 간격)
+
+def korean_sort_keys(titles) -> np.ndarray:
+    """제목 목록 전체의 정렬 키를 NumPy로 한 번에 계산 (숫자 > 영어 > 한글 > 기타 순)
+
+    각 글자를 `그룹 * 0x110000 + 코드 포인트 + 1` 정수로 바꿔 big-endian 4바이트로 이어 붙이므로
+    키를 바이트 단위로 비교하면 제목 순서가 됩니다. 한글 음절 코드는 초성 순으로 배열되어 있어
+    코드 포인트 비교만으로 (초성, 음절) 순서가 유지됩니다. 문자열이 아닌 제목은 맨 뒤로 보냅니다.
+    """
+    lowered = pd.Series(titles, dtype=object).str.lower()  # 영문 대소문자 구분 없이
+    is_text = lowered.notna().to_numpy()
+    text = lowered.where(is_text, "").str.slice(0, SORT_KEY_MAX_CHARS)
+    lengths = text.str.len().to_numpy(dtype=np.int64)
+    width = max(int(lengths.max(initial=0)), 1)
+
+    codes = np.frombuffer("".join(text).encode("utf-32-le", "surrogatepass"), dtype="<u4").astype(np.uint32)
+    groups = np.full(codes.shape, 3, dtype=np.uint32)  # 기타
+    groups[(codes >= ord('0')) & (codes <= ord('9'))] = 0  # 숫자
+    groups[(codes >= ord('a')) & (codes <= ord('z'))] = 1  # 영어
+    groups[(codes >= ord('가')) & (codes <= ord('힣'))] = 2  # 한글
+
+    # 0은 '글자 없음'으로 남겨 두어 짧은 제목이 같은 접두어의 긴 제목보다 앞에 오도록 합니다.
+    matrix = np.zeros((len(lengths), width), dtype=">u4")
+    rows = np.repeat(np.arange(len(lengths)), lengths)
+    cols = np.arange(len(codes)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    matrix[rows, cols] = groups * _SORT_GROUP_SPAN + codes + 1
+    matrix[~is_text, 0] = 4 * _SORT_GROUP_SPAN + 1
+    return matrix.view(f"S{4 * width}").ravel()
+
+def korean_sort_key(s) -> bytes:
+    """제목 하나의 정렬 키 (korean_sort_keys와 같은 바이트 키, 한 건씩 비교할 때 쓰는 순수 파이썬 경로)"""
     if not isinstance(s, str):
-        return (4, s) # 문자열이 아닌 경우 맨 뒤로
-
-    CHOSUNG_LIST = ['ㄱ', 'ㄲ', 'ㄴ', 'ㄷ', 'ㄸ', 'ㄹ', 'ㅁ', 'ㅂ', 'ㅃ', 'ㅅ', 'ㅆ', 'ㅇ', 'ㅈ', 'ㅉ', 'ㅊ', 'ㅋ', 'ㅌ', 'ㅍ', 'ㅎ']
-    
-    result = []
-    for char in s.lower(): # 영문 대소문자 구분 없이
-        if '가' <= char <= '힣':
-            char_code = ord(char) - ord('가')
-            chosung_index = char_code // (21 * 28)
-            result.append((2, CHOSUNG_LIST[chosung_index], char)) # 한글
+        return (4 * _SORT_GROUP_SPAN + 1).to_bytes(4, "big")
+    key = bytearray()
+    for char in s.lower()[:SORT_KEY_MAX_CHARS]:
+        code = ord(char)
+        if '0' <= char <= '9':
+            group = 0
         elif 'a' <= char <= 'z':
-            result.append((1, char)) # 영어
-        elif '0' <= char <= '9':
-            result.append((0, char)) # 숫자
+            group = 1
+        elif '가' <= char <= '힣':
+            group = 2
         else:
-            result.append((3, char)) # 기타
-    return result
+            group = 3
+        key += (group * _SORT_GROUP_SPAN + code + 1).to_bytes(4, "big")
+    return bytes(key)
+
+def to_categorical(values: pd.Series, known_values: list) -> pd.Categorical:
+    """정해진 값 목록을 범주로 쓰는 categorical 컬럼 (목록에 없는 값도 잃지 않도록 범주에 추가)"""
+    extra_values = sorted(set(values.dropna()) - set(known_values))
+    return pd.Categorical(values, categories=known_values + extra_values)
+
+def to_timestamps(values: pd.Series) -> pd.Series:
+    """ISO 문자열 타임스탬프를 한 번만 datetime으로 변환"""
+    return pd.to_datetime(values, utc=True, format="ISO8601", errors="coerce")
+
+def prepare_problem_frame(problem_df: pd.DataFrame) -> pd.DataFrame:
+    """스냅샷을 만들 때 한 번만 하는 변환 (범주형/시간 컬럼 압축, 제목 정렬 순위 계산)"""
+    categorical_columns = {
+        "category": PROBLEM_CATEGORIES,
+        "chapter": PROBLEM_CHAPTERS,
+        "difficulty": DIFFICULTIES,
+        "question_type": QUESTION_TYPES,
+        "creator_email": [],
+    }
+    for column, known_values in categorical_columns.items():
+        if column in problem_df.columns:
+            problem_df[column] = to_categorical(problem_df[column], known_values)
+    for column in ("created_at", "updated_at"):
+        if column in problem_df.columns:
+            problem_df[column] = to_timestamps(problem_df[column])
+    if "title" in problem_df.columns:
+        # 바이트 정렬 키(글자당 4바이트) 대신 그 순위만 int32로 보관 (같은 제목은 같은 순위, DataFrame을 만들 때마다 다시 계산)
+        _, ranks = np.unique(korean_sort_keys(problem_df["title"]), return_inverse=True)
+        problem_df["sort_rank"] = ranks.astype(np.int32)
+    return problem_df
+
+def prepare_solution_frame(solution_df: pd.DataFrame) -> pd.DataFrame:
+    """풀이 스냅샷 압축 (사용자 컬럼은 범주형, 시간 컬럼은 datetime)"""
+    for column in ("user_email", "user_name"):
+        if column in solution_df.columns:
+            solution_df[column] = to_categorical(solution_df[column], [])
+    for column in ("solved_at", "created_at"):
+        if column in solution_df.columns:
+            solution_df[column] = to_timestamps(solution_df[column])
+    return solution_df
+
+SNAPSHOT_FRAME_PREPARERS = {"problems": prepare_problem_frame, "solutions": prepare_solution_frame}
+# DataFrame을 이 컬럼 순서로 정렬해 둠 (같은 값끼리는 최근 생성 순, 없으면 최근 생성 순만)
+SNAPSHOT_FRAME_SORT_COLUMNS = {"problems": "sort_rank"}
+
+# --- 문제 검색 (n-gram 역색인) ---
+# 검색 대상 필드와 순위 가중치
+SEARCH_FIELD_WEIGHTS = {"title": 3.0, "question": 2.0, "explanation": 1.0}
+# 한국어는 띄어쓰기로 단어를 나눌 수 없으므로 글자 단위 n-gram으로 색인합니다.
+# 1-gram은 거의 모든 문제에 걸려 후보를 줄이지 못하므로 색인하지 않고, 한 글자 검색어는 원문에서 바로 찾습니다.
+SEARCH_NGRAM_SIZES = (2, 3)
+SEARCH_INDEX_REBUILD_THRESHOLD = 1000  # 마지막 빌드 이후 바뀐 문제가 이만큼 쌓이면 백그라운드에서 다시 빌드
+
+class NGramIndex:
+    """문제 제목/내용/해설에 대한 글자 n-gram 역색인
+
+    문제 id를 0부터 시작하는 번호로 바꾸고, 포스팅은 n-gram별 정렬된 int32 배열을 하나로 이어 붙여
+    (CSR 형식) 보관합니다. 빌드는 백그라운드 스레드에서 하므로 스냅샷 반영(upsert)은 원문 정규화만 합니다.
+    빌드 이후 바뀐 문제는 작은 보조 색인(recent_postings)에 넣고, 기본 색인에서는 stale로 표시해 제외합니다.
+    첫 빌드가 끝나기 전의 검색은 원문을 모두 확인합니다.
+    """
+
+    def __init__(self, field_weights: dict):
+        self.field_weights = field_weights
+        self.documents = {}  # 문제 id -> {필드: 정규화된 텍스트}
+        self.numbers = {}  # 문제 id -> 번호
+        self.doc_ids = []  # 번호 -> 문제 id (삭제된 번호는 None)
+        self.gram_slots = None  # n-gram -> 포스팅 위치 (빌드 전이면 None)
+        self.offsets = np.zeros(1, dtype=np.int64)  # 포스팅 k는 posting_values[offsets[k]:offsets[k + 1]]
+        self.posting_values = np.zeros(0, dtype=np.int32)
+        self.stale = set()  # 기본 색인의 포스팅을 믿을 수 없는 번호 (빌드 이후 수정/삭제됨)
+        self.recent_postings = defaultdict(set)  # 빌드 이후 수정/추가된 문제의 n-gram -> 번호 집합
+        self.recent_grams = {}  # 번호 -> 보조 색인에 넣은 n-gram 집합
+        self.changed_during_build = None  # 빌드 중에 바뀐 문제 id (빌드 중이 아니면 None)
+        self.lock = threading.RLock()
+
+    @staticmethod
+    def normalize(text) -> str:
+        if not isinstance(text, str):
+            return ""
+        return " ".join(text.lower().split())
+
+    @staticmethod
+    def ngrams(text: str, size: int):
+        return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+    @classmethod
+    def document_grams(cls, fields: dict) -> set:
+        return {gram for text in fields.values() for size in SEARCH_NGRAM_SIZES for gram in cls.ngrams(text, size)}
+
+    def upsert(self, rows):
+        with self.lock:
+            for row in rows:
+                doc_id = row["id"]
+                self.documents[doc_id] = {field: self.normalize(row.get(field)) for field in self.field_weights}
+                if self.changed_during_build is not None:
+                    self.changed_during_build.add(doc_id)
+                if self.gram_slots is not None:
+                    self._index_recent(doc_id)
+            self._schedule_build()
+
+    def delete(self, ids):
+        with self.lock:
+            for doc_id in ids:
+                if self.documents.pop(doc_id, None) is None:
+                    continue
+                if self.changed_during_build is not None:
+                    self.changed_during_build.add(doc_id)
+                number = self.numbers.pop(doc_id, None)
+                if number is not None:
+                    self._forget_recent(number)
+                    self.stale.add(number)
+                    self.doc_ids[number] = None
+            self._schedule_build()
+
+    def _index_recent(self, doc_id):
+        """빌드 이후 바뀐 문제 하나를 보조 색인에 반영 (lock을 잡은 상태에서 호출)"""
+        number = self.numbers.get(doc_id)
+        if number is None:
+            number = self.numbers[doc_id] = len(self.doc_ids)
+            self.doc_ids.append(doc_id)
+        self._forget_recent(number)
+        self.stale.add(number)
+        grams = self.document_grams(self.documents[doc_id])
+        for gram in grams:
+            self.recent_postings[gram].add(number)
+        self.recent_grams[number] = grams
+
+    def _forget_recent(self, number):
+        for gram in self.recent_grams.pop(number, ()):
+            posting = self.recent_postings[gram]
+            posting.discard(number)
+            if not posting:
+                del self.recent_postings[gram]
+
+    def _schedule_build(self):
+        """아직 빌드하지 않았거나 보조 색인이 커졌으면 백그라운드 빌드 시작 (lock을 잡은 상태에서 호출)"""
+        if self.changed_during_build is not None:
+            return  # 이미 빌드 중 (끝난 뒤 바뀐 문제는 보조 색인으로 옮김)
+        if self.gram_slots is not None and len(self.stale) < SEARCH_INDEX_REBUILD_THRESHOLD:
+            return
+        self.changed_during_build = set()
+        documents = dict(self.documents)
+        threading.Thread(target=self._build, args=(documents,), name="search-index-build", daemon=True).start()
+
+    def _build(self, documents: dict):
+        """documents로 기본 색인을 새로 만들고, 빌드 중에 바뀐 문제는 보조 색인에 넣어 교체"""
+        started = time.perf_counter()
+        try:
+            doc_ids = list(documents)
+            gram_slots = {}
+            pair_slots, pair_numbers = [], []
+            for number, doc_id in enumerate(doc_ids):
+                slots = [gram_slots.setdefault(gram, len(gram_slots)) for gram in self.document_grams(documents[doc_id])]
+                pair_slots.append(np.array(slots, dtype=np.int32))
+                pair_numbers.append(np.full(len(slots), number, dtype=np.int32))
+            slots = np.concatenate(pair_slots) if pair_slots else np.zeros(0, dtype=np.int32)
+            numbers = np.concatenate(pair_numbers) if pair_numbers else np.zeros(0, dtype=np.int32)
+            order = np.argsort(slots, kind="stable")  # 같은 n-gram 안에서는 번호 순서가 유지됨
+            offsets = np.zeros(len(gram_slots) + 1, dtype=np.int64)
+            np.cumsum(np.bincount(slots, minlength=len(gram_slots)), out=offsets[1:])
+            posting_values = numbers[order]
+        except Exception as e:
+            logger.error("검색 색인을 만들지 못했습니다: %s", e)
+            with self.lock:
+                self.changed_during_build = None
+            return
+
+        with self.lock:
+            changed = self.changed_during_build
+            self.gram_slots, self.offsets, self.posting_values = gram_slots, offsets, posting_values
+            self.doc_ids = doc_ids
+            self.numbers = {doc_id: number for number, doc_id in enumerate(doc_ids)}
+            self.stale = set()
+            self.recent_postings = defaultdict(set)
+            self.recent_grams = {}
+            self.changed_during_build = None
+            for doc_id in changed:
+                if doc_id in self.documents:
+                    self._index_recent(doc_id)
+                elif doc_id in self.numbers:
+                    number = self.numbers.pop(doc_id)
+                    self.stale.add(number)
+                    self.doc_ids[number] = None
+        perf.record("search_index.build", time.perf_counter() - started)
+        logger.info("검색 색인 빌드: 문제 %d개, n-gram %d개 (%.1fMB)", len(doc_ids), len(gram_slots),
+                    posting_values.nbytes / 1e6)
+
+    def _base_posting(self, gram: str) -> np.ndarray:
+        slot = self.gram_slots.get(gram)
+        if slot is None:
+            return self.posting_values[:0]
+        return self.posting_values[self.offsets[slot]:self.offsets[slot + 1]]
+
+    def _candidates(self, terms: list):
+        """모든 단어의 n-gram을 가진 문제 id (lock을 잡은 상태에서 호출, 후보를 줄일 수 없으면 전체)"""
+        grams = {gram for term in terms if len(term) >= min(SEARCH_NGRAM_SIZES)
+                 for gram in self.ngrams(term, min(len(term), max(SEARCH_NGRAM_SIZES)))}
+        if not grams or self.gram_slots is None:
+            return list(self.documents)
+
+        # 1. 기본 색인의 포스팅을 작은 것부터 교집합하고, 빌드 이후 바뀐 문제(stale)는 제외
+        base = None
+        for posting in sorted((self._base_posting(gram) for gram in grams), key=len):
+            base = posting if base is None else np.intersect1d(base, posting, assume_unique=True)
+            if not len(base):
+                break
+        if self.stale and len(base):
+            base = base[~np.isin(base, np.fromiter(self.stale, dtype=np.int32, count=len(self.stale)))]
+
+        # 2. 빌드 이후 바뀐 문제는 보조 색인에서 같은 방식으로 찾음
+        recent = None
+        for posting in sorted((self.recent_postings.get(gram, set()) for gram in grams), key=len):
+            recent = set(posting) if recent is None else recent & posting
+            if not recent:
+                break
+        numbers = base.tolist() + sorted(recent)
+        return [self.doc_ids[number] for number in numbers]
+
+    def search(self, query: str) -> list:
+        """검색어의 모든 단어를 포함하는 문제 id를 관련도 순으로 반환"""
+        terms = self.normalize(query).split()
+        if not terms:
+            return []
+
+        with self.lock:
+            candidates = self._candidates(terms)
+
+            # n-gram이 모두 있어도 연속된 부분 문자열이 아닐 수 있으므로 원문으로 확인하고 점수 계산
+            results = []
+            for doc_id in candidates:
+                fields = self.documents[doc_id]
+                score = 0.0
+                for term in terms:
+                    term_score = sum(weight for field, weight in self.field_weights.items() if term in fields[field])
+                    if not term_score:
+                        break
+                    score += term_score
+                else:
+                    title_position = fields["title"].find(terms[0])
+                    results.append((-score, title_position if title_position >= 0 else len(fields["title"]), doc_id))
+
+        results.sort(key=lambda result: result[:2])
+        return [doc_id for _, _, doc_id in results]
+
+@st.cache_resource
+def get_problem_search_index() -> NGramIndex:
+    """problems 스냅샷과 함께 갱신되는 프로세스 공용 검색 색인"""
+    return NGramIndex(SEARCH_FIELD_WEIGHTS)
+
+# --- 문제 상세 조회 (id 기준 LRU 캐시) ---
+PROBLEM_DETAIL_CACHE_SIZE = 256  # 메모리에 보관할 최대 문제 수
+
+class ProblemDetailCache:
+    """id로 조회한 문제 전체 행을 최근 사용 순으로 일정 개수만 보관하는 LRU 캐시
+
+    problems 스냅샷의 리스너로 등록되어, 수정/삭제된 문제는 캐시에서 바로 빠집니다.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, problem_id):
+        with self.lock:
+            problem = self.entries.get(problem_id)
+            if problem is not None:
+                self.entries.move_to_end(problem_id)
+            return problem
+
+    def put(self, problem_id, problem: dict):
+        with self.lock:
+            self.entries[problem_id] = problem
+            self.entries.move_to_end(problem_id)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def upsert(self, rows):
+        self.delete([row["id"] for row in rows])
+
+    def delete(self, ids):
+        with self.lock:
+            for problem_id in ids:
+                self.entries.pop(problem_id, None)
+
+@st.cache_resource
+def get_problem_detail_cache() -> ProblemDetailCache:
+    return ProblemDetailCache(PROBLEM_DETAIL_CACHE_SIZE)
+
+@traced
+def fetch_problem(repo: Repository, problem_id):
+    """문제 하나의 전체 컬럼을 id로 조회 (없으면 None)"""
+    cache = get_problem_detail_cache()
+    problem = cache.get(problem_id)
+    perf.increment(f"cache.problem_detail.{'miss' if problem is None else 'hit'}")
+    if problem is None:
+        problem = repo.fetch_problem(problem_id)
+        if problem is None:
+            return None
+        cache.put(problem_id, problem)
+    return dict(problem)  # 캐시에 있는 행은 세션끼리 공유하므로 복사본을 반환
+
+# --- 이미지 캐시 ---
+# 문제 이미지와 프로필 사진을 원격 URL 대신 로컬에 받아 둔 바이트로 st.image에 넘깁니다.
+IMAGE_CACHE_DIR = st.secrets.get("IMAGE_CACHE_DIR") or os.getenv("IMAGE_CACHE_DIR", "image_cache")
+IMAGE_CACHE_MAX_BYTES = 256 * 1024 * 1024  # 디스크에 보관할 최대 용량 (넘으면 오래 안 쓴 파일부터 삭제)
+IMAGE_CACHE_HOT_BYTES = 32 * 1024 * 1024  # 메모리에도 들고 있을 최근 이미지 용량
+IMAGE_CACHE_REVALIDATE_SECONDS = 60 * 60  # 이 시간이 지나면 ETag로 바뀌었는지 확인
+IMAGE_PREFETCH_COUNT = 3  # 목록에서 미리 받아 둘 문제 수 (현재 페이지 맨 위부터)
+
+class ImageCache:
+    """URL별 이미지 바이트를 디스크에 최근 사용 순으로 보관하는 LRU 캐시 (최근 이미지는 메모리에도 보관)
+
+    Storage 파일 이름은 내용 해시라서 거의 바뀌지 않지만, 프로필 사진처럼 같은 URL의 내용이 바뀔 수 있으므로
+    IMAGE_CACHE_REVALIDATE_SECONDS가 지나면 If-None-Match로 다시 확인합니다. (304면 본문을 받지 않음)
+    원격 요청이 실패하면 디스크에 남은 이전 파일을 그대로 씁니다.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int, hot_bytes: int, http_client):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hot_bytes = hot_bytes
+        self.http_client = http_client
+        self.entries = OrderedDict()  # URL -> {"file", "etag", "size", "checked_at"} (오래 안 쓴 순)
+        self.disk_bytes = 0
+        self.hot = OrderedDict()  # URL -> 바이트
+        self.hot_size = 0
+        self.lock = threading.Lock()
+        self.prefetch_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="image-prefetch")
+        os.makedirs(cache_dir, exist_ok=True)
+        self._load_index()
+
+    def _load_index(self):
+        """재시작해도 받아 둔 파일을 다시 쓰도록 디스크의 메타데이터로 목록을 복원 (수정 시각 순)"""
+        loaded = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.cache_dir, name), encoding="utf-8") as f:
+                    meta = json.load(f)
+                data_path = os.path.join(self.cache_dir, meta["file"])
+                loaded.append((os.path.getmtime(data_path), meta["url"], {**meta, "size": os.path.getsize(data_path)}))
+            except (OSError, ValueError, KeyError):
+                continue  # 저장 도중 종료된 파일은 건너뜀 (다음 정리 때 덮어씀)
+        for _, url, entry in sorted(loaded, key=lambda item: item[0]):
+            self.entries[url] = entry
+            self.disk_bytes += entry["size"]
+        self._evict()
+
+    def get(self, url: str) -> bytes | None:
+        """URL의 이미지 바이트 (받지 못했고 남은 파일도 없으면 None)"""
+        with self.lock:
+            entry = self.entries.get(url)
+            if entry is not None:
+                self.entries.move_to_end(url)
+            fresh = entry is not None and time.time() - entry["checked_at"] < IMAGE_CACHE_REVALIDATE_SECONDS
+            data = self.hot.get(url) if fresh else None
+            if data is not None:
+                self.hot.move_to_end(url)
+        if data is not None:
+            perf.increment("cache.image.hot_hit")
+            return data
+        if fresh:
+            data = self._read(entry)
+            if data is not None:
+                perf.increment("cache.image.disk_hit")
+                self._remember(url, data)
+                return data
+        return self._fetch(url, entry)
+
+    def _fetch(self, url: str, entry: dict | None) -> bytes | None:
+        headers = {"If-None-Match": entry["etag"]} if entry and entry.get("etag") else {}
+        try:
+            with trace_span("image_cache.fetch"):
+                response = self.http_client.get(url, headers=headers)
+            if response.status_code == 304 and entry is not None:
+                perf.increment("cache.image.revalidated")
+                data = self._read(entry)
+                if data is not None:
+                    self._store(url, data, entry.get("etag"), write_file=False)
+                    return data
+                response = self.http_client.get(url)  # 메타데이터만 남고 파일이 없어진 경우
+            response.raise_for_status()
+        except Exception as e:
+            perf.increment("cache.image.error")
+            logger.warning("이미지를 받지 못했습니다 (%s): %s", url, e)
+            return self._read(entry) if entry is not None else None
+        perf.increment("cache.image.miss")
+        data = response.content
+        self._store(url, data, response.headers.get("ETag"))
+        return data
+
+    def _read(self, entry: dict) -> bytes | None:
+        path = os.path.join(self.cache_dir, entry["file"])
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)  # 재시작 후에도 최근 사용 순서를 유지
+            return data
+        except OSError:
+            return None
+
+    def _store(self, url: str, data: bytes, etag: str | None, write_file: bool = True):
+        file_stem = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        entry = {"url": url, "file": f"{file_stem}.img", "etag": etag, "checked_at": time.time(), "size": len(data)}
+        try:
+            if write_file:
+                # 다른 스레드가 읽는 중에 내용이 반쯤 바뀌지 않도록 임시 파일에 쓴 뒤 교체
+                tmp_path = os.path.join(self.cache_dir, f"{file_stem}.{threading.get_ident()}.tmp")
+                with open(tmp_path, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, os.path.join(self.cache_dir, entry["file"]))
+            with open(os.path.join(self.cache_dir, f"{file_stem}.json"), "w", encoding="utf-8") as f:
+                json.dump({key: entry[key] for key in ("url", "file", "etag", "checked_at")}, f)
+        except OSError as e:
+            logger.warning("이미지 캐시 파일을 저장하지 못했습니다: %s", e)
+            self._remember(url, data)
+            return
+        with self.lock:
+            previous = self.entries.pop(url, None)
+            if previous is not None:
+                self.disk_bytes -= previous["size"]
+            self.entries[url] = entry
+            self.disk_bytes += entry["size"]
+            self._evict()
+        self._remember(url, data)
+
+    def _remember(self, url: str, data: bytes):
+        """최근 이미지를 메모리에 보관 (hot_bytes를 넘으면 오래된 것부터 버림)"""
+        if len(data) > self.hot_bytes:
+            return
+        with self.lock:
+            previous = self.hot.pop(url, None)
+            if previous is not None:
+                self.hot_size -= len(previous)
+            self.hot[url] = data
+            self.hot_size += len(data)
+            while self.hot_size > self.hot_bytes:
+                _, evicted = self.hot.popitem(last=False)
+                self.hot_size -= len(evicted)
+
+    def _evict(self):
+        """디스크 용량이 max_bytes 아래로 내려갈 때까지 오래 안 쓴 파일을 삭제 (lock을 잡은 상태에서 호출)"""
+        while self.disk_bytes > self.max_bytes and self.entries:
+            url, entry = self.entries.popitem(last=False)
+            self.disk_bytes -= entry["size"]
+            if (evicted := self.hot.pop(url, None)) is not None:
+                self.hot_size -= len(evicted)
+            file_stem = entry["file"].rsplit(".", 1)[0]
+            for name in (entry["file"], f"{file_stem}.json"):
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except OSError:
+                    pass
+            perf.increment("cache.image.evicted")
+
+    def prefetch(self, urls):
+        """이미지를 백그라운드에서 미리 받아 둠 (이미 최신인 이미지는 건너뜀)"""
+        for url in urls:
+            if not is_remote_url(url):
+                continue
+            with self.lock:
+                entry = self.entries.get(url)
+                fresh = entry is not None and time.time() - entry["checked_at"] < IMAGE_CACHE_REVALIDATE_SECONDS
+            if not fresh:
+                self.prefetch_executor.submit(self.get, url)
+
+    def prefetch_problems(self, repo: Repository, detail_cache: ProblemDetailCache, problem_ids):
+        """문제 상세 행과 문제 이미지를 백그라운드에서 미리 받아 둠 (목록에서 곧 열 문제)"""
+        def _prefetch(problem_id):
+            try:
+                problem = detail_cache.get(problem_id)
+                if problem is None:
+                    problem = repo.fetch_problem(problem_id)
+                    if problem is None:
+                        return
+                    detail_cache.put(problem_id, problem)
+                self.prefetch([problem.get("question_image_url")])
+            except Exception as e:
+                logger.warning("문제 %s 미리 받기 실패: %s", problem_id, e)
+
+        for problem_id in problem_ids:
+            self.prefetch_executor.submit(_prefetch, problem_id)
+
+def is_remote_url(url) -> bool:
+    return isinstance(url, str) and url.startswith(("http://", "https://"))
+
+@st.cache_resource
+def get_image_cache() -> ImageCache:
+    return ImageCache(IMAGE_CACHE_DIR, IMAGE_CACHE_MAX_BYTES, IMAGE_CACHE_HOT_BYTES, get_http_client())
+
+def image_source(url):
+    """st.image에 넘길 값: 원격 이미지는 캐시에서 받은 바이트, 로컬 경로나 받지 못한 이미지는 그대로"""
+    if not is_remote_url(url):
+        return url
+    data = get_image_cache().get(url)
+    return data if data is not None else url
+
+# --- 사용자별 푼 문제 색인 ---
+class SolvedSetIndex:
+    """사용자 이메일별로 맞힌 문제 id 집합을 들고 있는 색인 (solutions 스냅샷 리스너)"""
+
+    def __init__(self):
+        self.solved = defaultdict(set)  # 이메일 -> 문제 id 집합
+        self.pairs_by_id = {}  # 풀이 id -> (이메일, 문제 id)
+        self.lock = threading.Lock()
+
+    def upsert(self, rows):
+        with self.lock:
+            for row in rows:
+                pair = (row.get("user_email"), row.get("problem_id"))
+                self.pairs_by_id[row["id"]] = pair
+                self.solved[pair[0]].add(pair[1])
+
+    def delete(self, ids):
+        with self.lock:
+            for solution_id in ids:
+                pair = self.pairs_by_id.pop(solution_id, None)
+                if pair is not None and pair not in self.pairs_by_id.values():
+                    self.solved[pair[0]].discard(pair[1])
+
+    def solved_by(self, user_email: str) -> frozenset:
+        with self.lock:
+            return frozenset(self.solved.get(user_email, ()))
+
+@st.cache_resource
+def get_solved_set_index() -> SolvedSetIndex:
+    return SolvedSetIndex()
+
+# --- 대시보드 집계 ---
+class DashboardAggregates:
+    """대시보드 통계를 행이 바뀔 때마다 조금씩 고쳐 두는 집계 (problems/solutions 스냅샷 리스너)
+
+    사용자별 생성/풀이 수, 문제별 풀이 수, 날짜별 활동 수를 들고 있어 대시보드가 전체 DataFrame을
+    groupby/merge하지 않아도 됩니다. 풀이 기록은 처음 보는 id만 더하고, 삭제는 저장하지 못해
+    되돌린 기록(SolutionWriteQueue)에서만 들어옵니다.
+    """
+
+    def __init__(self):
+        self.problems = {}  # 문제 id -> (작성자 (이름, 이메일), 생성 날짜, 제목)
+        self.created_by_user = defaultdict(int)  # (이름, 이메일) -> 만든 문제 수
+        self.solved_by_user = defaultdict(int)  # (이름, 이메일) -> 푼 문제 수
+        self.solves_by_problem = defaultdict(int)  # 문제 id -> 풀이 수
+        self.created_by_day = defaultdict(int)  # 'YYYY-MM-DD' -> 만든 문제 수
+        self.solved_by_day = defaultdict(int)  # 'YYYY-MM-DD' -> 풀이 수
+        self.solutions = {}  # 풀이 id -> ((이름, 이메일), 문제 id, 날짜)
+        self.version = 0
+        self.lock = threading.Lock()
+        self._frames = {}  # 이름 -> (버전, DataFrame)
+
+    def upsert_problems(self, rows):
+        with self.lock:
+            for row in rows:
+                self._remove_problem(row["id"])
+                creator = (row.get("creator_name"), row.get("creator_email"))
+                day = str(row.get("created_at") or "")[:10]
+                self.problems[row["id"]] = (creator, day, row.get("title"))
+                self.created_by_user[creator] += 1
+                self.created_by_day[day] += 1
+            self.version += 1
+
+    def delete_problems(self, ids):
+        with self.lock:
+            for problem_id in ids:
+                self._remove_problem(problem_id)
+            self.version += 1
+
+    def _remove_problem(self, problem_id):
+        previous = self.problems.pop(problem_id, None)
+        if previous is not None:
+            creator, day, _ = previous
+            self.created_by_user[creator] -= 1
+            self.created_by_day[day] -= 1
+
+    def upsert_solutions(self, rows):
+        with self.lock:
+            for row in rows:
+                if row["id"] in self.solutions:
+                    continue
+                solution = ((row.get("user_name"), row.get("user_email")), row.get("problem_id"),
+                            str(row.get("solved_at") or row.get("created_at") or "")[:10])
+                self.solutions[row["id"]] = solution
+                self.solved_by_user[solution[0]] += 1
+                self.solves_by_problem[solution[1]] += 1
+                self.solved_by_day[solution[2]] += 1
+            self.version += 1
+
+    def delete_solutions(self, ids):
+        with self.lock:
+            for solution_id in ids:
+                solution = self.solutions.pop(solution_id, None)
+                if solution is not None:
+                    self.solved_by_user[solution[0]] -= 1
+                    self.solves_by_problem[solution[1]] -= 1
+                    self.solved_by_day[solution[2]] -= 1
+            self.version += 1
+
+    def listener_for(self, table_name: str):
+        """스냅샷에 등록할 리스너 (upsert/delete)"""
+        if table_name == "problems":
+            return SimpleNamespace(upsert=self.upsert_problems, delete=self.delete_problems)
+        return SimpleNamespace(upsert=self.upsert_solutions, delete=self.delete_solutions)
+
+    def title_of(self, problem_id):
+        with self.lock:
+            problem = self.problems.get(problem_id)
+        return problem[2] if problem else None
+
+    def solve_count_of(self, problem_ids) -> list:
+        with self.lock:
+            return [self.solves_by_problem.get(problem_id, 0) for problem_id in problem_ids]
+
+    def _cached_frame(self, name: str, build) -> pd.DataFrame:
+        """집계가 바뀌었을 때만 DataFrame을 다시 만듭니다. (세션끼리 공유하므로 수정 금지)"""
+        with self.lock:
+            cached = self._frames.get(name)
+            if cached is None or cached[0] != self.version:
+                cached = (self.version, build())
+                self._frames[name] = cached
+            return cached[1]
+
+    def user_stats_frame(self) -> pd.DataFrame:
+        def build():
+            users = [user for user in {**self.created_by_user, **self.solved_by_user}
+                     if self.created_by_user.get(user, 0) or self.solved_by_user.get(user, 0)]
+            df = pd.DataFrame({
+                '이름': [name for name, _ in users],
+                '이메일': [email for _, email in users],
+                '문제 생성 수': [self.created_by_user.get(user, 0) for user in users],
+                '문제 풀이 수': [self.solved_by_user.get(user, 0) for user in users],
+            })
+            return df.sort_values(by=['문제 생성 수', '문제 풀이 수'], ascending=False).reset_index(drop=True)
+        return self._cached_frame("user_stats", build)
+
+    def daily_activity_frame(self) -> pd.DataFrame:
+        def build():
+            days = sorted(day for day in {**self.created_by_day, **self.solved_by_day} if day)
+            return pd.DataFrame({
+                '문제 생성': [self.created_by_day.get(day, 0) for day in days],
+                '풀이': [self.solved_by_day.get(day, 0) for day in days],
+            }, index=pd.to_datetime(days))
+        return self._cached_frame("daily_activity", build)
+
+@st.cache_resource
+def get_dashboard_aggregates() -> DashboardAggregates:
+    return DashboardAggregates()
+
+# 스냅샷을 만들 때 등록할 리스너
+SNAPSHOT_LISTENERS = {
+    "problems": [get_problem_search_index, get_problem_detail_cache,
+                 lambda: get_dashboard_aggregates().listener_for("problems")],
+    "solutions": [get_solved_set_index, lambda: get_dashboard_aggregates().listener_for("solutions")],
+}
+if REPLICATE_TO_LOCAL:
+    SNAPSHOT_LISTENERS["problems"].append(lambda: get_replica_listener("problems"))
+    SNAPSHOT_LISTENERS["solutions"].append(lambda: get_replica_listener("solutions"))
 
 # --- UI 렌더링 함수 ---
-def render_sidebar(user_info, supabase):
+@traced
+def render_sidebar(user_info, repo):
     with st.sidebar:
         st.header(f"👋 {user_info['name']}님")
         st.write(f"_{user_info['email']}_")
         st.divider()
         
-        if is_admin(supabase, user_info["email"]):
+        if user_info["is_admin"]:
             if st.button("📊 관리자 대시보드", key="sidebar_btn_dashboard", use_container_width=True):
                 st.session_state.page = "대시보드"
                 st.rerun()
@@ -258,24 +2742,52 @@ def render_sidebar(user_info, supabase):
             st.session_state.clear()
             st.rerun()
 
-def render_problem_list(problem_df):
-    """문제 목록을 화면에 렌더링"""
+def set_list_page(page: int):
+    st.session_state.list_page = page
+
+def render_list_pager(page: int, page_count: int):
+    """문제 목록 아래의 이전/다음 버튼 (콜백으로 페이지를 바꿔 목록 fragment만 다시 실행)"""
+    col_prev, col_info, col_next = st.columns([1, 2, 1])
+    with col_prev:
+        st.button("◀ 이전", key="list_prev", disabled=page == 0, use_container_width=True,
+                  on_click=set_list_page, args=(page - 1,))
+    with col_info:
+        st.caption(f"{page + 1} / {page_count}")
+    with col_next:
+        st.button("다음 ▶", key="list_next", disabled=page + 1 >= page_count, use_container_width=True,
+                  on_click=set_list_page, args=(page + 1,))
+
+def current_list_page(filters: tuple) -> int:
+    """필터 조건이 바뀌면 첫 페이지로 돌아간 뒤 현재 페이지 번호를 반환"""
+    if st.session_state.get("list_filters") != filters:
+        st.session_state.list_filters = filters
+        st.session_state.list_page = 0
+    return st.session_state.get("list_page", 0)
+
+# 필터/검색/페이지 이동은 이 fragment만 다시 실행하므로 사이드바와 로그인 확인은 건너뜁니다.
+# 한 번에 PROBLEM_LIST_PAGE_SIZE개 행만 그리므로 문제 수와 상관없이 위젯 수가 일정합니다.
+@st.fragment
+@traced
+def render_problem_list(repo: Repository, user_email: str):
+    """문제 목록을 화면에 렌더링 (스냅샷에서 정렬/필터링한 뒤 현재 페이지만 표시)"""
     st.header("📝 문제 목록")
+    problem_df = load_data_from_db(repo, "problems")
+    solved_ids = load_solved_problem_ids(repo, user_email)
     if problem_df.empty:
         st.warning("아직 등록된 문제가 없습니다. 새 문제를 만들어보세요!")
         return
 
-    # 제목을 기준으로 초성 정렬 (숫자 > 영어 > 한글)
-    problem_df['sort_key'] = problem_df['title'].apply(korean_sort_key)
-    problem_df = problem_df.sort_values(by='sort_key').drop(columns=['sort_key']).reset_index(drop=True)
+    # 스냅샷 DataFrame은 만들 때 이미 제목 초성 순(숫자 > 영어 > 한글)으로 정렬되어 있습니다.
 
     # --- 필터링 UI ---
     col1, col2 = st.columns(2)
     with col1:
-        categories = ["전체"] + sorted(problem_df["category"].unique().tolist())
+        categories = ["전체"] + sorted(problem_df["category"].dropna().unique().tolist())
         selected_category = st.selectbox("카테고리 선택", categories)
     with col2:
-        search_query = st.text_input("문제 제목으로 검색", placeholder="검색어를 입력하세요...")
+        search_query = st.text_input("제목·내용·해설로 검색", placeholder="검색어를 입력하세요...")
+    hide_solved = st.checkbox("푼 문제 숨기기", key="list_hide_solved")
+    page = current_list_page((selected_category, search_query, hide_solved))
 
     # --- 데이터 필터링 ---
     # 1. 카테고리 필터링
@@ -284,44 +2796,128 @@ def render_problem_list(problem_df):
     else:
         filtered_df = problem_df[problem_df["category"] == selected_category]
 
-    # 2. 검색어 필터링
+    # 2. 검색어 필터링 (검색 결과는 관련도 순으로 표시)
     if search_query:
-        filtered_df = filtered_df[filtered_df['title'].str.contains(search_query, case=False, na=False)]
+        ranked_ids = get_problem_search_index().search(search_query)
+        ranks = {problem_id: rank for rank, problem_id in enumerate(ranked_ids)}
+        filtered_df = filtered_df[filtered_df['id'].isin(ranks)]
+        filtered_df = filtered_df.iloc[np.argsort(filtered_df['id'].map(ranks).to_numpy(), kind='stable')]
+
+    # 3. 이미 푼 문제 숨기기
+    if hide_solved and solved_ids:
+        filtered_df = filtered_df[~filtered_df['id'].isin(solved_ids)]
 
     if filtered_df.empty:
         st.info("조건에 맞는 문제가 없습니다.")
         return
 
-    # 문제 목록 표시
-    st.write(f"총 {len(filtered_df)}개의 문제를 찾았습니다.")
-    for _, problem in filtered_df.iterrows():
-        with st.container(border=True):
-            col1, col2 = st.columns([4, 1])
-            with col1:
-                chapter_text = problem.get('chapter', '단원 미지정')
-                difficulty_text = problem.get('difficulty', '난이도 미지정')
-                st.subheader(f"{problem['title']} | {chapter_text}({difficulty_text})")
-                st.caption(f"분류: {problem.get('category', '미지정')} | 작성자: {problem.get('creator_name', '익명')}")
-            with col2:
-                if st.button("문제 풀기", key=f"solve_{problem['id']}", use_container_width=True):
-                    st.session_state.selected_problem_id = problem['id']
-                    st.session_state.page = "상세"
-                    st.rerun()
+    # 문제 목록 표시 (현재 페이지만)
+    total_count = len(filtered_df)
+    page_count = (total_count + PROBLEM_LIST_PAGE_SIZE - 1) // PROBLEM_LIST_PAGE_SIZE
+    page = min(page, page_count - 1)  # 다른 세션에서 문제가 지워져 페이지가 줄어든 경우
+    st.write(f"총 {total_count}개의 문제를 찾았습니다. ({page + 1}/{page_count} 페이지)")
+    start = page * PROBLEM_LIST_PAGE_SIZE
+    problems = filtered_df.iloc[start:start + PROBLEM_LIST_PAGE_SIZE].to_dict("records")
+    for problem in problems:
+        render_problem_row(problem, problem['id'] in solved_ids)
+    render_list_pager(page, page_count)
+    prefetch_problem_details(repo, problems)
+
+def prefetch_problem_details(repo: Repository, problems: list):
+    """현재 페이지 맨 위 문제들의 상세 행과 이미지를 미리 받아 상세 화면을 바로 열 수 있게 함"""
+    problem_ids = [problem['id'] for problem in problems[:IMAGE_PREFETCH_COUNT]]
+    get_image_cache().prefetch_problems(repo, get_problem_detail_cache(), problem_ids)
+
+@traced
+def render_problem_row(problem, solved: bool = False):
+    """문제 목록의 한 줄(제목, 분류, 풀기 버튼)을 렌더링"""
+    with st.container(border=True):
+        col1, col2 = st.columns([4, 1])
+        with col1:
+            chapter_text = problem.get('chapter', '단원 미지정')
+            difficulty_text = problem.get('difficulty', '난이도 미지정')
+            solved_badge = "✅ " if solved else ""
+            st.subheader(f"{solved_badge}{problem['title']} | {chapter_text}({difficulty_text})")
+            st.caption(f"분류: {problem.get('category', '미지정')} | 작성자: {problem.get('creator_name', '익명')}")
+        with col2:
+            if st.button("문제 풀기", key=f"solve_{problem['id']}", use_container_width=True):
+                st.session_state.selected_problem_id = problem['id']
+                st.session_state.page = "상세"
+                st.rerun()
+
+@traced
+def fetch_problem_page(repo: Repository, category: str, search_query: str, order_label: str, page: int,
+                       solved_by: str | None = None):
+    """조건에 맞는 문제 한 페이지와 전체 개수를 DB에서 조회 (solved_by가 푼 문제는 제외)"""
+    if repo.serves_reads_from_replica:
+        sync_table(repo, "problems")  # 복제본에 변경분을 반영한 뒤 로컬에서 조회
+    order_column, descending = PROBLEM_LIST_ORDERS[order_label]
+    return repo.fetch_problem_page(
+        PROBLEM_LIST_COLUMNS, None if category == "전체" else category, search_query, order_column, descending,
+        page * PROBLEM_LIST_PAGE_SIZE, PROBLEM_LIST_PAGE_SIZE, solved_by
+    )
 
-def render_problem_detail(problem, supabase, user_info):
+@st.fragment
+@traced
+def render_problem_list_paged(repo: Repository, user_email: str):
+    """문제 목록을 페이지 단위로 DB에서 조회해 렌더링"""
+    st.header("📝 문제 목록")
+    solved_ids = load_solved_problem_ids(repo, user_email)
+
+    # --- 필터링 UI ---
+    col1, col2, col3 = st.columns([2, 2, 1])
+    with col1:
+        categories = ["전체"] + list(CHAPTERS_BY_CATEGORY.keys())
+        selected_category = st.selectbox("카테고리 선택", categories)
+    with col2:
+        search_query = st.text_input("문제 제목으로 검색", placeholder="검색어를 입력하세요...")
+    with col3:
+        order_label = st.selectbox("정렬", list(PROBLEM_LIST_ORDERS.keys()))
+    hide_solved = st.checkbox("푼 문제 숨기기", key="list_hide_solved")
+
+    page = current_list_page((selected_category, search_query, order_label, hide_solved))
+
+    try:
+        problems, total_count = fetch_problem_page(
+            repo, selected_category, search_query, order_label, page, user_email if hide_solved else None
+        )
+    except Exception as e:
+        st.error(f"문제 목록 조회 오류: {e}")
+        return
+
+    if total_count == 0:
+        if selected_category == "전체" and not search_query and not hide_solved:
+            st.warning("아직 등록된 문제가 없습니다. 새 문제를 만들어보세요!")
+        else:
+            st.info("조건에 맞는 문제가 없습니다.")
+        return
+
+    page_count = (total_count + PROBLEM_LIST_PAGE_SIZE - 1) // PROBLEM_LIST_PAGE_SIZE
+    st.write(f"총 {total_count}개의 문제를 찾았습니다. ({page + 1}/{page_count} 페이지)")
+    for problem in problems:
+        render_problem_row(problem, problem['id'] in solved_ids)
+    render_list_pager(page, page_count)
+    prefetch_problem_details(repo, problems)
+
+@traced
+def render_problem_detail(problem, repo, user_info):
     """선택된 문제의 상세 정보와 풀이 화면을 렌더링"""
     st.header(problem['title'])
     
     chapter_text = problem.get('chapter', '미지정')
     difficulty_text = problem.get('difficulty', '미지정')
     st.info(f"**분류**: {problem.get('category', '미지정')} > {chapter_text} | **난이도**: {difficulty_text} | **작성자**: {problem.get('creator_name', '익명')}")
+    if problem["id"] in load_solved_problem_ids(repo, user_info["email"]):
+        st.caption("✅ 이미 푼 문제입니다.")
     
     st.markdown("---")
 
     # 문제 내용
     st.subheader("문제")
     if problem.get("question_image_url"):
-        st.image(problem["question_image_url"])
+        st.image(image_source(problem["question_image_url"]))
+        # 정답을 제출하면 바로 해설 이미지를 보여줄 수 있도록 미리 받아 둠
+        get_image_cache().prefetch([problem.get("explanation_image_url")])
     st.write(problem['question'])
 
     # 보기 (객관식/주관식)
@@ -346,31 +2942,31 @@ def render_problem_detail(problem, supabase, user_info):
                     "user_name": user_info["name"],
                     "solved_at": datetime.now().isoformat()
                 }
-                save_solution_to_db(supabase, solution_data)
+                save_solution_to_db(repo, solution_data)
             else:
                 st.error("오답입니다. 다시 시도해보세요. 🤔")
 
             # 해설 표시
             with st.expander("해설 보기"):
                 if problem.get("explanation_image_url"):
-                    st.image(problem["explanation_image_url"])
+                    st.image(image_source(problem["explanation_image_url"]))
                 st.write(problem.get('explanation', '해설이 없습니다.'))
         else:
             st.warning("답을 선택하거나 입력해주세요.")
 
     # 문제 관리 (작성자 및 관리자)
-    if user_info['email'] == problem.get('creator_email') or is_admin(supabase, user_info["email"]):
+    if user_info['email'] == problem.get('creator_email') or user_info["is_admin"]:
         st.divider()
         st.subheader("🔒 문제 관리")
         col1, col2 = st.columns(2)
         with col1:
             if st.button("✏️ 문제 수정하기", use_container_width=True):
-                st.session_state.problem_to_edit = problem
+                st.session_state.problem_to_edit_id = problem["id"]
                 st.session_state.page = "수정"
                 st.rerun()
         with col2:
             if st.button("🗑️ 문제 삭제하기", type="secondary", use_container_width=True):
-                delete_problem_from_db(supabase, problem)
+                delete_problem_from_db(repo, problem)
                 st.success("문제가 삭제되었습니다. 목록으로 돌아갑니다.")
                 st.session_state.page = "목록"
                 st.rerun()
@@ -380,7 +2976,8 @@ def render_problem_detail(problem, supabase, user_info):
         st.session_state.page = "목록"
         st.rerun()
 
-def render_edit_form(supabase: Client, problem: dict):
+@traced
+def render_edit_form(repo: Repository, problem: dict):
     """문제 수정을 위한 폼을 렌더링합니다."""
     st.header("✍️ 문제 수정하기")
 
@@ -408,7 +3005,7 @@ def render_edit_form(supabase: Client, problem: dict):
             default_chapter_index = None
         chapter = st.selectbox("📖 단원", chapters, index=default_chapter_index, key=f"{key_prefix}chapter")
 
-    difficulties = ["하", "중", "상"]
+    difficulties = DIFFICULTIES
     try:
         default_difficulty_index = difficulties.index(problem.get("difficulty"))
     except (ValueError, TypeError):
@@ -420,14 +3017,14 @@ def render_edit_form(supabase: Client, problem: dict):
     
     st.write("🖼️ 현재 문제 이미지")
     if problem.get("question_image_url"):
-        st.image(problem["question_image_url"])
+        st.image(image_source(problem.get("question_thumb_url") or problem["question_image_url"]))
     new_question_image = st.file_uploader("🔄️ 새로운 문제 이미지로 교체 (선택)", type=['png', 'jpg', 'jpeg'], key=f"{key_prefix}q_image")
 
     explanation = st.text_area("📝 문제 풀이/해설", value=problem.get("explanation", ""), key=f"{key_prefix}explanation")
 
     st.write("🖼️ 현재 해설 이미지")
     if problem.get("explanation_image_url"):
-        st.image(problem["explanation_image_url"])
+        st.image(image_source(problem.get("explanation_thumb_url") or problem["explanation_image_url"]))
     new_explanation_image = st.file_uploader("🔄️ 새로운 해설 이미지로 교체 (선택)", type=['png', 'jpg', 'jpeg'], key=f"{key_prefix}e_image")
 
     question_type = problem.get("question_type", "객관식")
@@ -465,24 +3062,25 @@ def render_edit_form(supabase: Client, problem: dict):
                 "answer": final_answer, "explanation": explanation,
             }
 
-            q_img_url = problem.get("question_image_url")
-            if new_question_image:
-                q_img_url, err1 = upload_image_to_storage(supabase, SUPABASE_BUCKET_NAME, new_question_image)
-                if err1: st.error(err1); return
-            updated_data["question_image_url"] = q_img_url
-
-            e_img_url = problem.get("explanation_image_url")
-            if new_explanation_image:
-                e_img_url, err2 = upload_image_to_storage(supabase, SUPABASE_BUCKET_NAME, new_explanation_image)
-                if err2: st.error(err2); return
-            updated_data["explanation_image_url"] = e_img_url
-            
-            update_problem_in_db(supabase, problem["id"], updated_data, problem)
+            # 새 이미지는 동시에 업로드하고, 모두 성공했을 때만 DB를 수정합니다.
+            image_urls, errors = upload_images_concurrently(repo, SUPABASE_BUCKET_NAME, {
+                "question": new_question_image,
+                "explanation": new_explanation_image,
+            })
+            if errors:
+                for err in errors: st.error(err)
+                return
+            for prefix in ("question", "explanation"):
+                old_urls = (problem.get(f"{prefix}_image_url"), problem.get(f"{prefix}_thumb_url"))
+                updated_data[f"{prefix}_image_url"], updated_data[f"{prefix}_thumb_url"] = image_urls.get(prefix, old_urls)
+
+            update_problem_in_db(repo, problem["id"], updated_data)
             st.success("🎉 문제가 성공적으로 수정되었습니다!")
             st.session_state.page = "상세"
             st.rerun()
 
-def render_creation_form(supabase, user_info):
+@traced
+def render_creation_form(repo, user_info):
     st.header("✍️ 새로운 문제 만들기")
     question_type = st.radio("📋 문제 유형", ('객관식', '주관식'), key="create_q_type")
 
@@ -496,7 +3094,7 @@ def render_creation_form(supabase, user_info):
         chapters = CHAPTERS_BY_CATEGORY[category]
         chapter = st.selectbox("📖 단원", chapters, index=None, placeholder="단원을 선택하세요.", key="create_chapter")
 
-    difficulty = st.selectbox("📊 난이도", ["하", "중", "상"], index=None, placeholder="난이도를 선택하세요.", key="create_difficulty")
+    difficulty = st.selectbox("📊 난이도", DIFFICULTIES, index=None, placeholder="난이도를 선택하세요.", key="create_difficulty")
 
     question = st.text_area("❓ 문제 내용", key="create_question")
     question_image = st.file_uploader("🖼️ 문제 이미지 추가 (선택)", type=['png', 'jpg', 'jpeg'], key="create_q_image")
@@ -527,67 +3125,66 @@ def render_creation_form(supabase, user_info):
             return
 
         with st.spinner('처리 중...'):
-            q_img_url, err1 = (None, None)
-            if question_image:
-                q_img_url, err1 = upload_image_to_storage(supabase, SUPABASE_BUCKET_NAME, question_image)
-                if err1: st.error(err1); return
-
-            e_img_url, err2 = (None, None)
-            if explanation_image:
-                e_img_url, err2 = upload_image_to_storage(supabase, SUPABASE_BUCKET_NAME, explanation_image)
-                if err2: st.error(err2); return
+            # 이미지는 동시에 업로드하고, 모두 성공했을 때만 문제를 저장합니다.
+            image_urls, errors = upload_images_concurrently(repo, SUPABASE_BUCKET_NAME, {
+                "question": question_image,
+                "explanation": explanation_image,
+            })
+            if errors:
+                for err in errors: st.error(err)
+                return
+            q_img_url, q_thumb_url = image_urls.get("question", (None, None))
+            e_img_url, e_thumb_url = image_urls.get("explanation", (None, None))
 
             new_problem = {
                 "title": title, "category": category, "chapter": chapter, "difficulty": difficulty,
                 "question": question, "option1": options[0], "option2": options[1], "option3": options[2], "option4": options[3],
                 "answer": final_answer, "creator_name": user_info["name"], "creator_email": user_info["email"],
                 "explanation": explanation, "question_type": question_type, "question_image_url": q_img_url,
-                "explanation_image_url": e_img_url, "created_at": datetime.now().isoformat()
+                "question_thumb_url": q_thumb_url, "explanation_image_url": e_img_url,
+                "explanation_thumb_url": e_thumb_url, "created_at": datetime.now().isoformat()
             }
-            save_problem_to_db(supabase, new_problem)
+            save_problem_to_db(repo, new_problem)
             st.success("🎉 문제가 성공적으로 만들어졌습니다!")
             st.balloons()
             st.session_state.page = "목록"
             st.rerun()
             
-def render_dashboard(problem_df, solution_df):
-    """관리자용 대시보드 렌더링"""
+DASHBOARD_HISTORY_PAGE_SIZE = 50  # 풀이 기록 탭에서 한 번에 보여줄 행 수
+
+@traced
+def render_dashboard(repo: Repository, problem_df):
+    """관리자용 대시보드 렌더링 (통계는 DashboardAggregates에서 읽고, 풀이 기록은 페이지 단위로 조회)"""
     st.header("📊 관리자 대시보드")
     st.write("이곳에서 문제 및 풀이 통계를 확인할 수 있습니다.")
+    col_admins, col_problems, col_solutions = st.columns(3)
+    with col_admins:
+        if st.button("🔄 관리자 목록 새로고침", key="dashboard_refresh_admins", use_container_width=True):
+            invalidate_admin_cache()
+            st.session_state.user_info = None  # 다음 실행에서 관리자 여부를 다시 확인
+            st.rerun()
+    for column, table_name, label in ((col_problems, "problems", "문제"), (col_solutions, "solutions", "풀이 기록")):
+        with column:
+            if st.button(f"🔄 {label} 새로고침", key=f"dashboard_refresh_{table_name}", use_container_width=True):
+                invalidate_table_snapshot(table_name)
+                st.rerun()
 
-    # 사용자별 통계 데이터 가공
-    user_stats = pd.DataFrame()
-    if not problem_df.empty:
-        creation_counts = problem_df.groupby(['creator_name', 'creator_email']).size().reset_index(name='문제 생성 수')
-        creation_counts = creation_counts.rename(columns={'creator_name': '이름', 'creator_email': '이메일'})
-    else:
-        creation_counts = pd.DataFrame(columns=['이름', '이메일', '문제 생성 수'])
-
-    if not solution_df.empty:
-        solution_counts = solution_df.groupby(['user_name', 'user_email']).size().reset_index(name='문제 풀이 수')
-        solution_counts = solution_counts.rename(columns={'user_name': '이름', 'user_email': '이메일'})
-    else:
-        solution_counts = pd.DataFrame(columns=['이름', '이메일', '문제 풀이 수'])
-
-    if not creation_counts.empty or not solution_counts.empty:
-        user_stats = pd.merge(
-            creation_counts,
-            solution_counts,
-            on=['이름', '이메일'],
-            how='outer'
-        ).fillna(0)
-        user_stats['문제 생성 수'] = user_stats['문제 생성 수'].astype(int)
-        user_stats['문제 풀이 수'] = user_stats['문제 풀이 수'].astype(int)
-
-    tab1, tab2, tab3 = st.tabs(["사용자별 통계", "문제 통계", "풀이 통계"])
+    aggregates = get_dashboard_aggregates()
+    tab1, tab2, tab3, tab4 = st.tabs(["사용자별 통계", "문제 통계", "풀이 통계", "성능"])
 
     with tab1:
         st.subheader("사용자별 활동 요약")
+        user_stats = aggregates.user_stats_frame()
         if not user_stats.empty:
-            st.dataframe(user_stats.sort_values(by=['문제 생성 수', '문제 풀이 수'], ascending=False).reset_index(drop=True))
+            st.dataframe(user_stats)
         else:
             st.warning("활동 기록이 없습니다.")
 
+        st.subheader("일별 활동")
+        daily_activity = aggregates.daily_activity_frame()
+        if not daily_activity.empty:
+            st.line_chart(daily_activity)
+
     with tab2:
         st.subheader("등록된 문제 목록")
         if not problem_df.empty:
@@ -601,79 +3198,155 @@ def render_dashboard(problem_df, solution_df):
                 'creator_name': '작성자',
                 'created_at': '생성일시'
             })
-            st.dataframe(problem_display_df)
+            problem_display_df['풀이 수'] = aggregates.solve_count_of(problem_df['id'])
+            st.dataframe(problem_display_df.sort_values('생성일시', ascending=False))  # 스냅샷은 제목 순
         else:
             st.warning("등록된 문제가 없습니다.")
 
     with tab3:
         st.subheader("사용자 풀이 기록")
-        if not solution_df.empty:
-            solution_display_df = solution_df.copy()
-            if not problem_df.empty:
-                problem_titles = problem_df[['id', 'title']]
-                solution_display_df = pd.merge(
-                    solution_display_df,
-                    problem_titles,
-                    left_on='problem_id',
-                    right_on='id',
-                    how='left'
-                )
-                solution_display_df['title'] = solution_display_df['title'].fillna('삭제된 문제')
-            else:
-                solution_display_df['title'] = '알 수 없음'
-
-            solution_display_df = solution_display_df[['user_name', 'title', 'solved_at']].rename(columns={
-                'user_name': '사용자',
-                'title': '문제 제목',
-                'solved_at': '풀이 일시'
-            })
-            st.dataframe(solution_display_df.sort_values(by='풀이 일시', ascending=False).reset_index(drop=True))
+        page = st.session_state.get("dashboard_history_page", 0)
+        try:
+            solutions, total_count = repo.fetch_solution_page(page * DASHBOARD_HISTORY_PAGE_SIZE, DASHBOARD_HISTORY_PAGE_SIZE)
+        except Exception as e:
+            st.error(f"풀이 기록 조회 오류: {e}")
+            solutions, total_count = [], 0
+
+        if solutions:
+            st.dataframe(pd.DataFrame({
+                '사용자': [row.get('user_name') for row in solutions],
+                '문제 제목': [aggregates.title_of(row.get('problem_id')) or '삭제된 문제' for row in solutions],
+                '풀이 일시': [row.get('solved_at') for row in solutions]
+            }))
+
+            page_count = (total_count + DASHBOARD_HISTORY_PAGE_SIZE - 1) // DASHBOARD_HISTORY_PAGE_SIZE
+            col_prev, col_info, col_next = st.columns([1, 2, 1])
+            with col_prev:
+                if st.button("◀ 이전", key="dashboard_history_prev", disabled=page == 0, use_container_width=True):
+                    st.session_state.dashboard_history_page = page - 1
+                    st.rerun()
+            with col_info:
+                st.caption(f"{page + 1} / {page_count} (총 {total_count}건)")
+            with col_next:
+                if st.button("다음 ▶", key="dashboard_history_next", disabled=page + 1 >= page_count, use_container_width=True):
+                    st.session_state.dashboard_history_page = page + 1
+                    st.rerun()
         else:
             st.warning("풀이 기록이 없습니다.")
 
+    with tab4:
+        st.subheader("구간별 소요 시간")
+        st.caption(f"구간마다 최근 {PERF_SAMPLES_PER_SPAN}번의 측정값 기준입니다. (횟수는 서버 시작 이후 누적)")
+        span_stats = perf.span_stats()
+        if span_stats:
+            span_df = pd.DataFrame(span_stats)
+            for column in ['p50', 'p95', 'p99', 'max']:
+                span_df[column] = (span_df[column] * 1000).round(2)
+            st.dataframe(span_df[['span', 'count', 'p50', 'p95', 'p99', 'max']].rename(columns={
+                'span': '구간',
+                'count': '횟수',
+                'p50': 'p50 (ms)',
+                'p95': 'p95 (ms)',
+                'p99': 'p99 (ms)',
+                'max': '최대 (ms)'
+            }).sort_values(by='p95 (ms)', ascending=False).reset_index(drop=True))
+        else:
+            st.warning("아직 측정값이 없습니다.")
+
+        st.subheader("캐시 적중/전송 행 수")
+        counters = perf.counter_values()
+        if counters.get("transport.calls"):
+            error_rate = counters.get("transport.errors", 0) / counters["transport.calls"]
+            st.caption(f"원격 호출 오류율: {error_rate:.1%} | 회로 차단기: {get_circuit_breaker().state}")
+        if counters:
+            st.dataframe(pd.DataFrame(list(counters.items()), columns=['항목', '값']))
+        feed = get_change_feed()
+        st.caption(f"변경 피드: {CHANGE_FEED} ({'연결됨' if feed is not None and feed.live else '주기적 확인'})")
+        if METRICS_PORT:
+            st.caption(f"Prometheus: `:{METRICS_PORT}/metrics`")
+        if st.button("측정값 초기화", key="dashboard_reset_perf"):
+            perf.reset()
+            st.rerun()
+
+    with st.expander("💾 스냅샷 메모리 사용량"):
+        # 두 테이블의 DataFrame을 압축 전/후로 모두 만들어야 하므로 요청할 때만 계산합니다.
+        if st.checkbox("계산하기", key="dashboard_memory_report"):
+            reports = [get_table_snapshot(table_name).memory_report() for table_name in ("problems", "solutions")]
+            st.dataframe(pd.DataFrame(reports).rename(columns={
+                'table': '테이블',
+                'rows': '행 수',
+                'bytes_per_row_before': '행당 bytes (압축 전)',
+                'bytes_per_row_after': '행당 bytes (압축 후)',
+                'total_bytes_before': '전체 bytes (압축 전)',
+                'total_bytes_after': '전체 bytes (압축 후)'
+            }))
+
+    with st.expander("⏱️ 시작 시간"):
+        labels = {
+            'import_seconds': '모듈 import',
+            'client_init_seconds': 'Supabase 클라이언트 생성',
+            'first_render_seconds': '첫 화면 렌더링 (스크립트 시작부터)'
+        }
+        timings = get_startup_timings()
+        st.dataframe(pd.DataFrame(
+            [{'단계': label, '초': round(timings[key], 3)} for key, label in labels.items() if key in timings]
+        ))
+
 # --- 앱 실행 로직 ---
-def run_app(supabase, user_info):
-    """로그인 후 실행되는 메인 애플리케이션 로직"""
-    # 1. 데이터 로드
-    problem_df = load_data_from_db(supabase, "problems")
-    solution_df = load_data_from_db(supabase, "solutions")
+def load_problem_or_return_to_list(repo: Repository, problem_id):
+    """상세/수정 화면용 문제를 조회하고, 없으면 목록으로 돌아갑니다."""
+    if not problem_id:
+        st.warning("문제를 찾을 수 없거나 선택되지 않았습니다. 목록으로 돌아갑니다.")
+        st.session_state.page = "목록"
+        st.rerun()
+
+    try:
+        problem = fetch_problem(repo, problem_id)
+    except Exception as e:
+        st.error(f"문제 조회 오류: {e}")
+        return None
 
-    # 2. 사이드바 렌더링
-    render_sidebar(user_info, supabase)
+    if problem is None:
+        st.warning("문제를 찾을 수 없습니다. 목록으로 돌아갑니다.")
+        st.session_state.page = "목록"
+        st.rerun()
+    return problem
 
-    # 3. 페이지 상태에 따라 다른 UI 렌더링
+@traced
+def run_app(repo, user_info):
+    """로그인 후 실행되는 메인 애플리케이션 로직"""
+    # 1. 사이드바 렌더링
+    render_sidebar(user_info, repo)
+    failed_solutions = get_solution_write_queue(repo).take_failures(user_info["email"])
+    if failed_solutions:
+        aggregates = get_dashboard_aggregates()
+        titles = ", ".join(aggregates.title_of(row["problem_id"]) or "삭제된 문제" for row in failed_solutions)
+        st.warning(f"⚠️ 풀이 기록 {len(failed_solutions)}건을 저장하지 못했습니다. 다시 풀어주세요: {titles}")
+    if DATA_BACKEND == "supabase" and get_circuit_breaker().is_degraded():
+        st.warning("⚠️ 서버 연결이 불안정해 마지막으로 불러온 데이터를 보여주고 있습니다. 저장은 잠시 후 다시 시도해주세요.")
+
+    # 2. 페이지 상태에 따라 필요한 데이터만 로드하고 다른 UI 렌더링
     page = st.session_state.get("page", "목록")
 
     if page == "목록":
-        render_problem_list(problem_df)
+        if PROBLEM_LIST_MODE == "paged":
+            render_problem_list_paged(repo, user_info["email"])
+        else:
+            render_problem_list(repo, user_info["email"])
     elif page == "상세":
         problem_id = st.session_state.get("selected_problem_id")
-        if problem_id and not problem_df.empty:
-            # ID가 문자열(UUID)이므로 문자열로 직접 비교합니다.
-            selected_problem_series = problem_df[problem_df['id'] == problem_id]
-            if not selected_problem_series.empty:
-                selected_problem = selected_problem_series.iloc[0].to_dict()
-                render_problem_detail(selected_problem, supabase, user_info)
-            else:
-                st.warning("문제를 찾을 수 없습니다. 목록으로 돌아갑니다.")
-                st.session_state.page = "목록"
-                st.rerun()
-        else:
-            st.warning("문제를 찾을 수 없거나 선택되지 않았습니다. 목록으로 돌아갑니다.")
-            st.session_state.page = "목록"
-            st.rerun()
+        selected_problem = load_problem_or_return_to_list(repo, problem_id)
+        if selected_problem:
+            render_problem_detail(selected_problem, repo, user_info)
     elif page == "만들기":
-        render_creation_form(supabase, user_info)
+        render_creation_form(repo, user_info)
     elif page == "수정":
-        problem_to_edit = st.session_state.get("problem_to_edit")
+        problem_to_edit = load_problem_or_return_to_list(repo, st.session_state.get("problem_to_edit_id"))
         if problem_to_edit:
-            render_edit_form(supabase, problem_to_edit)
-        else:
-            st.warning("수정할 문제가 선택되지 않았습니다. 목록으로 돌아갑니다.")
-            st.session_state.page = "목록"
-            st.rerun()
-    elif page == "대시보드" and is_admin(supabase, user_info['email']):
-        render_dashboard(problem_df, solution_df)
+            render_edit_form(repo, problem_to_edit)
+    elif page == "대시보드" and user_info["is_admin"]:
+        sync_table(repo, "solutions")  # 집계만 최신으로 맞추고 풀이 DataFrame은 만들지 않음
+        render_dashboard(repo, load_data_from_db(repo, "problems"))
     else:
         st.session_state.page = "목록"
         st.rerun()
@@ -688,6 +3361,9 @@ def main():
         st.error("OAuth2.0 클라이언트 ID와 시크릿이 secrets.toml 파일에 설정되지 않았습니다.")
         return  # 🚨 st.stop() 대신 return
 
+    if METRICS_PORT:
+        start_metrics_exporter(int(METRICS_PORT))
+
     oauth2 = OAuth2Component(
         CLIENT_ID, CLIENT_SECRET,
         AUTHORIZE_ENDPOINT, TOKEN_ENDPOINT, TOKEN_ENDPOINT, REVOKE_ENDPOINT
@@ -711,25 +3387,12 @@ def main():
 
     # 2️⃣ 로그인 된 경우
     else:
-        token_details = st.session_state.get("token", {})
-
-
-        user_details = {}
-        if "id_token" in token_details:
-            try:
-                decoded = jwt.decode(
-                    token_details["id_token"],
-                    options={"verify_signature": False}
-                )
-                user_details = {
-                    "name": decoded.get("name"),
-                    "email": decoded.get("email"),
-                    "picture": decoded.get("picture"),
-                }
-            except Exception as e:
-                st.error(f"ID Token 디코딩 실패: {e}")
-
-
+        repo = get_repository()
+        try:
+            user_details = resolve_principal(repo, oauth2)
+        except Exception as e:
+            st.error(f"로그인 정보 확인 실패: {e}")
+            user_details = None
 
         if not user_details:
             st.error("사용자 정보를 가져오는 데 실패했습니다. 다시 로그인해주세요.")
@@ -739,14 +3402,14 @@ def main():
             return
 
         # ✅ 로그인 성공 시 UI 실행
-        st.session_state.user_info = user_details
         st.success(f"환영합니다, {user_details['name']}님!")
         if user_details.get("picture"):
-            st.image(user_details["picture"], width=100)
+            st.image(image_source(user_details["picture"]), width=100)
         st.write("이메일:", user_details["email"])
 
-        run_app(supabase, user_details)
-        
+        run_app(repo, user_details)
+        record_startup_timing("first_render_seconds", time.perf_counter() - _SCRIPT_STARTED)
+
 if __name__ == "__main__":
     initialize_app_state()
     main()
@@ -0,0 +1,269 @@
+"""합성 데이터로 app.py의 주요 화면 렌더링 시간과 최대 메모리를 측정하는 벤치마크
+
+문제 1천/1만/10만 개(풀이 기록은 문제 수의 10배, 최대 100만 개) 카탈로그를 로컬 SQLite 저장소
+(DATA_BACKEND="sqlite")에 만들고, Streamlit AppTest로 목록/상세/대시보드 화면을 다시 실행하며 측정합니다.
+Supabase나 구글 로그인 없이 실행되며, 결과는 JSON으로 저장해 이전 결과와 비교할 수 있습니다.
+
+    python benchmark.py                                  # 기본 크기(1000 10000 100000)로 측정
+    python benchmark.py --sizes 1000 --reruns 3          # 작은 카탈로그만 빠르게
+    python benchmark.py --output benchmark_base.json     # 결과를 지정한 파일에 저장 (기본은 임시 폴더)
+    python benchmark.py --baseline benchmark_base.json   # 이전 결과와 비교
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta, timezone
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_PATH = os.path.join(APP_DIR, "app.py")
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+SOLUTIONS_PER_PROBLEM = 10
+MAX_SOLUTIONS = 1_000_000
+SOLUTIONS_PER_USER = 40  # 사용자 한 명이 평균적으로 푼 문제 수
+BENCHMARK_EMAIL = "benchmark-admin@example.com"
+APP_TIMEOUT = 600  # 10만 개 카탈로그의 첫 실행(스냅샷 로딩)까지 기다릴 시간(초)
+
+# 제목 생성용 단어 (한글/영어/숫자로 시작하는 제목을 섞어 정렬 경로를 모두 거치게 합니다)
+TITLE_TEMPLATES = [
+    "{chapter} 기본 개념 확인", "{chapter} 응용 문제", "{chapter} 심화 {n}", "{chapter} 서술형 연습",
+    "수능 대비 {chapter}", "{n}번 {chapter} 빈출 유형", "{chapter} 오답 노트 {n}", "모의고사 {n}회 {chapter}",
+    "Check-up {n}: {chapter}", "{chapter} 함정 피하기", "ㄱ. {chapter} 개념 정리", "{chapter} 실전 {n}",
+]
+QUESTION_SENTENCES = [
+    "다음 중 옳은 것만을 있는 대로 고른 것은?", "빈칸에 들어갈 말로 가장 적절한 것은?",
+    "그래프를 보고 물음에 답하시오.", "주어진 조건을 만족시키는 값을 구하시오.",
+]
+
+
+def generate_problems(count: int, rng: random.Random, chapters_by_category: dict, difficulties, question_types):
+    """CHAPTERS_BY_CATEGORY 전체에 고르게 퍼진 합성 문제 목록"""
+    categories = list(chapters_by_category)
+    start = datetime(2025, 3, 1, tzinfo=timezone.utc)
+    problems = []
+    for i in range(count):
+        category = categories[i % len(categories)]
+        chapter = rng.choice(chapters_by_category[category])
+        created_at = (start + timedelta(seconds=rng.randrange(365 * 24 * 3600))).isoformat()
+        problems.append({
+            "id": str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+            "title": rng.choice(TITLE_TEMPLATES).format(chapter=chapter, n=rng.randint(1, 99)),
+            "category": category, "chapter": chapter, "difficulty": rng.choice(difficulties),
+            "question_type": rng.choice(question_types),
+            "question": " ".join(rng.choices(QUESTION_SENTENCES, k=3)),
+            "option1": "ㄱ", "option2": "ㄴ", "option3": "ㄱ, ㄴ", "option4": "ㄴ, ㄷ", "answer": str(rng.randint(1, 4)),
+            "explanation": f"{chapter} 단원의 핵심 개념을 이용합니다.",
+            "creator_name": f"선생님{i % 37}", "creator_email": f"teacher{i % 37}@example.com",
+            "created_at": created_at, "updated_at": created_at,
+        })
+    return problems
+
+
+def generate_solutions(problems, count: int, rng: random.Random):
+    """(problem_id, user_email)이 겹치지 않는 합성 풀이 기록"""
+    user_count = max(count // SOLUTIONS_PER_USER, 1)
+    pairs = set()
+    while len(pairs) < count:
+        pairs.add((rng.randrange(len(problems)), rng.randrange(user_count)))
+    start = datetime(2025, 3, 1, tzinfo=timezone.utc)
+    solutions = []
+    for problem_index, user_index in pairs:
+        solved_at = (start + timedelta(seconds=rng.randrange(365 * 24 * 3600))).isoformat()
+        solutions.append((
+            str(uuid.UUID(int=rng.getrandbits(128), version=4)), problems[problem_index]["id"],
+            f"student{user_index}@example.com", f"학생{user_index}", solved_at, solved_at,
+        ))
+    return solutions
+
+
+def build_catalog(db_path: str, problem_count: int, seed: int, app):
+    """합성 카탈로그를 SQLite 파일에 저장하고 (문제 수, 풀이 수, 상세 화면용 문제 id)를 반환"""
+    import sqlite3
+
+    rng = random.Random(seed + problem_count)
+    problems = generate_problems(problem_count, rng, app.CHAPTERS_BY_CATEGORY, app.DIFFICULTIES, app.QUESTION_TYPES)
+    solutions = generate_solutions(problems, min(problem_count * SOLUTIONS_PER_PROBLEM, MAX_SOLUTIONS), rng)
+
+    conn = sqlite3.connect(db_path)
+    with conn:
+        conn.executescript(app.SQLITE_SCHEMA)
+        columns = list(problems[0])
+        conn.executemany(
+            f"INSERT INTO problems ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+            [[problem[column] for column in columns] for problem in problems],
+        )
+        conn.executemany(
+            "INSERT INTO solutions (id, problem_id, user_email, user_name, solved_at, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+            solutions,
+        )
+        conn.execute("INSERT INTO admin_emails (email) VALUES (?)", (BENCHMARK_EMAIL,))
+    conn.close()
+    return len(problems), len(solutions), problems[len(problems) // 2]["id"]
+
+
+def make_app_test(page: str, selected_problem_id: str = None):
+    """로그인된 관리자 세션으로 시작하는 AppTest (ID 토큰 검증은 이미 끝난 것으로 둡니다)"""
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(APP_PATH, default_timeout=APP_TIMEOUT)
+    at.secrets["oauth_credentials"] = {"CLIENT_ID": "benchmark", "CLIENT_SECRET": "benchmark"}
+    at.session_state["token"] = {"id_token": "benchmark"}
+    at.session_state["user_info"] = {
+        "name": "벤치마크", "email": BENCHMARK_EMAIL, "picture": None, "is_admin": True,
+        "expires_at": time.time() + 24 * 3600,
+    }
+    at.session_state["page"] = page
+    if selected_problem_id is not None:
+        at.session_state["selected_problem_id"] = selected_problem_id
+    return at
+
+
+def timed_run(run, trace_memory: bool):
+    """(걸린 시간(초), 최대 메모리(bytes) 또는 None)"""
+    if trace_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    run()
+    elapsed = time.perf_counter() - started
+    peak = None
+    if trace_memory:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return elapsed, peak
+
+
+def summarize(name: str, catalog: dict, cold, warm_times, warm_peak):
+    return {
+        "scenario": name, **catalog,
+        "cold_seconds": cold[0], "cold_peak_bytes": cold[1],
+        "warm_seconds": warm_times, "warm_median_seconds": statistics.median(warm_times),
+        "warm_peak_bytes": warm_peak,
+    }
+
+
+def bench_page(name: str, catalog: dict, reruns: int, page: str, selected_problem_id: str = None):
+    """한 화면의 첫 실행(cold)과 다시 실행(warm) 시간, 최대 메모리를 측정
+
+    시간은 tracemalloc 없이 재고, 메모리는 따로 한 번 더 실행해 잽니다. (추적 비용이 시간에 섞이지 않도록)
+    """
+    import streamlit as st
+
+    st.cache_resource.clear()  # 카탈로그마다 스냅샷/색인을 처음부터 만듭니다.
+    at = make_app_test(page, selected_problem_id)
+    cold = timed_run(at.run, trace_memory=True)
+    if at.exception:
+        raise RuntimeError(f"{name} 화면 실행 중 오류: {at.exception[0].value}")
+    warm_times = [timed_run(at.run, trace_memory=False)[0] for _ in range(reruns)]
+    warm_peak = timed_run(at.run, trace_memory=True)[1]
+    return summarize(name, catalog, cold, warm_times, warm_peak)
+
+
+def bench_sort(catalog: dict, reruns: int, db_path: str, app):
+    """제목 전체의 한글 정렬 (korean_sort_keys 벡터화 경로와 korean_sort_key 단건 경로)"""
+    import sqlite3
+
+    conn = sqlite3.connect(db_path)
+    titles = [row[0] for row in conn.execute("SELECT title FROM problems")]
+    conn.close()
+
+    def sort_vectorized():
+        app.korean_sort_keys(titles).argsort(kind="stable")
+
+    def sort_per_title():
+        sorted(titles, key=app.korean_sort_key)
+
+    results = []
+    for name, run in (("sort_vectorized", sort_vectorized), ("sort_per_title", sort_per_title)):
+        cold = timed_run(run, trace_memory=True)
+        warm_times = [timed_run(run, trace_memory=False)[0] for _ in range(reruns)]
+        warm_peak = timed_run(run, trace_memory=True)[1]
+        results.append(summarize(name, catalog, cold, warm_times, warm_peak))
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=APP_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_comparison(results, baseline_path: str):
+    """이전 결과와 화면/카탈로그 크기별 warm 중앙값을 비교해 출력"""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {(r["scenario"], r["problems"]): r for r in json.load(f)["results"]}
+    print(f"\n기준 결과({baseline_path})와 비교 (warm 중앙값, 1보다 작으면 빨라짐)")
+    for result in results:
+        before = baseline.get((result["scenario"], result["problems"]))
+        if before is None:
+            continue
+        ratio = result["warm_median_seconds"] / before["warm_median_seconds"]
+        print(f"  {result['scenario']:<16} {result['problems']:>7}문제  "
+              f"{before['warm_median_seconds'] * 1000:9.1f}ms -> {result['warm_median_seconds'] * 1000:9.1f}ms  x{ratio:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="합성 데이터로 주요 화면의 렌더링 성능을 측정합니다.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="측정할 문제 수 목록")
+    parser.add_argument("--reruns", type=int, default=5, help="화면마다 다시 실행해 잴 횟수")
+    parser.add_argument("--seed", type=int, default=42, help="합성 데이터 난수 시드")
+    parser.add_argument("--output", help="결과를 저장할 JSON 파일 (기본값: 임시 작업 폴더의 benchmark_results.json)")
+    parser.add_argument("--baseline", help="비교할 이전 결과 JSON 파일")
+    args = parser.parse_args()
+    baseline_path = os.path.abspath(args.baseline) if args.baseline else None
+
+    work_dir = tempfile.mkdtemp(prefix="study-inside-bench-")
+    output_path = os.path.abspath(args.output) if args.output else os.path.join(work_dir, "benchmark_results.json")
+    # app.py는 시작할 때 st.secrets를 읽으므로, 빈 secrets.toml이 있는 임시 폴더에서 실행합니다.
+    os.makedirs(os.path.join(work_dir, ".streamlit"))
+    with open(os.path.join(work_dir, ".streamlit", "secrets.toml"), "w", encoding="utf-8") as f:
+        f.write("# benchmark\n")
+    os.chdir(work_dir)
+    os.environ["DATA_BACKEND"] = "sqlite"
+    os.environ["LOCAL_STORAGE_DIR"] = os.path.join(work_dir, "storage")
+    sys.path.insert(0, APP_DIR)
+    import app  # 카탈로그 스키마/상수와 정렬 함수만 사용 (화면은 AppTest로 실행)
+
+    results = []
+    for size in args.sizes:
+        db_path = os.path.join(work_dir, f"catalog_{size}.sqlite3")
+        os.environ["SQLITE_DB_PATH"] = db_path
+        print(f"\n문제 {size:,}개 카탈로그를 만드는 중...")
+        problem_count, solution_count, detail_id = build_catalog(db_path, size, args.seed, app)
+        catalog = {"problems": problem_count, "solutions": solution_count}
+
+        for name, page, problem_id in (("list", "목록", None), ("detail", "상세", detail_id), ("dashboard", "대시보드", None)):
+            results.append(bench_page(name, catalog, args.reruns, page, problem_id))
+        results.extend(bench_sort(catalog, args.reruns, db_path, app))
+        for result in results[-5:]:
+            print(f"  {result['scenario']:<16} cold {result['cold_seconds'] * 1000:9.1f}ms  "
+                  f"warm {result['warm_median_seconds'] * 1000:9.1f}ms  "
+                  f"peak {(result['warm_peak_bytes'] or 0) / 2**20:7.1f}MiB (cold {(result['cold_peak_bytes'] or 0) / 2**20:.1f}MiB)")
+
+    report = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(), "git_revision": git_revision(),
+            "python": platform.python_version(), "platform": platform.platform(),
+            "seed": args.seed, "reruns": args.reruns,
+        },
+        "results": results,
+    }
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n✅ 결과를 {output_path}에 저장했습니다.")
+
+    if baseline_path:
+        print_comparison(results, baseline_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""Storage 'images' 버킷에서 어떤 문제도 가리키지 않는 이미지를 찾아 삭제하는 정리 작업
+
+앱은 문제를 삭제/수정할 때 이미지를 바로 지우지 않으므로, 이 스크립트를 주기적으로 실행해 정리합니다.
+
+    python cleanup_images.py                 # 삭제 대상만 보여줌 (dry-run)
+    python cleanup_images.py --apply         # 실제로 삭제
+    python cleanup_images.py --grace-hours 6 # 업로드 후 6시간이 지난 파일만 대상
+"""
+import argparse
+import logging
+import os
+import sys
+import tomllib
+from datetime import datetime, timedelta, timezone
+
+from supabase import create_client
+
+BUCKET_NAME = "images"
+# problems 테이블에서 Storage 파일을 가리키는 컬럼
+IMAGE_URL_COLUMNS = ["question_image_url", "question_thumb_url", "explanation_image_url", "explanation_thumb_url"]
+DEFAULT_GRACE_HOURS = 24  # 업로드 직후 아직 DB에 저장되지 않은 파일을 지우지 않도록 두는 유예 시간
+LIST_PAGE_SIZE = 1000  # 버킷 목록 조회 단위
+PROBLEM_PAGE_SIZE = 1000  # problems 테이블 조회 단위
+REMOVE_BATCH_SIZE = 500  # 한 번의 remove 호출로 지울 파일 수
+
+logger = logging.getLogger("cleanup_images")
+
+
+def load_supabase_credentials():
+    """환경 변수 또는 secrets.toml에서 Supabase URL/Key를 읽습니다."""
+    url, key = os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_KEY")
+    if url and key:
+        return url, key
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    for secrets_path in (os.path.join(script_dir, ".streamlit", "secrets.toml"), os.path.join(script_dir, "secrets.toml")):
+        if os.path.exists(secrets_path):
+            with open(secrets_path, "rb") as f:
+                secrets = tomllib.load(f)
+            if secrets.get("SUPABASE_URL") and secrets.get("SUPABASE_KEY"):
+                return secrets["SUPABASE_URL"], secrets["SUPABASE_KEY"]
+    raise RuntimeError("SUPABASE_URL과 SUPABASE_KEY를 환경 변수나 secrets.toml에 설정해야 합니다.")
+
+
+def list_bucket_objects(supabase):
+    """버킷의 모든 파일을 {경로: 생성 시각} 형태로 반환"""
+    bucket = supabase.storage.from_(BUCKET_NAME)
+    objects, offset = {}, 0
+    while True:
+        page = bucket.list("", {"limit": LIST_PAGE_SIZE, "offset": offset, "sortBy": {"column": "name", "order": "asc"}})
+        for item in page:
+            if item.get("id") is None:
+                continue  # 폴더
+            objects[item["name"]] = datetime.fromisoformat(item["created_at"].replace("Z", "+00:00"))
+        if len(page) < LIST_PAGE_SIZE:
+            return objects
+        offset += LIST_PAGE_SIZE
+
+
+def collect_referenced_paths(supabase, public_url_prefix: str):
+    """problems 테이블의 이미지 컬럼이 가리키는 버킷 안의 파일 경로 집합"""
+    referenced, start = set(), 0
+    while True:
+        rows = (
+            supabase.table("problems").select(",".join(IMAGE_URL_COLUMNS))
+            .order("id").range(start, start + PROBLEM_PAGE_SIZE - 1).execute().data
+        )
+        for row in rows:
+            for column in IMAGE_URL_COLUMNS:
+                image_url = row.get(column)
+                if isinstance(image_url, str) and image_url.startswith(public_url_prefix):
+                    referenced.add(image_url[len(public_url_prefix):])
+        if len(rows) < PROBLEM_PAGE_SIZE:
+            return referenced
+        start += PROBLEM_PAGE_SIZE
+
+
+def find_orphans(objects: dict, referenced: set, grace: timedelta):
+    """참조되지 않고 유예 시간이 지난 파일 경로 목록"""
+    cutoff = datetime.now(timezone.utc) - grace
+    return sorted(path for path, created_at in objects.items() if path not in referenced and created_at < cutoff)
+
+
+def remove_in_batches(supabase, paths, public_url_prefix: str):
+    """배치마다 삭제 직전에 참조를 다시 확인하고, 그동안 다시 쓰이게 된 파일은 남겨둠
+
+    같은 내용의 이미지는 기존 파일을 재사용하므로 (created_at은 처음 올린 시각 그대로) 유예 시간만으로는
+    목록 조회 이후 저장된 문제가 가리키는 파일을 가려낼 수 없습니다.
+    """
+    bucket = supabase.storage.from_(BUCKET_NAME)
+    removed = 0
+    for start in range(0, len(paths), REMOVE_BATCH_SIZE):
+        referenced = collect_referenced_paths(supabase, public_url_prefix)
+        batch = []
+        for path in paths[start:start + REMOVE_BATCH_SIZE]:
+            if path in referenced:
+                print(f"  - {path}: 그 사이 다시 사용되어 건너뜁니다.")
+            else:
+                batch.append(path)
+        if batch:
+            bucket.remove(batch)
+        removed += len(batch)
+        print(f"  {min(start + REMOVE_BATCH_SIZE, len(paths))}/{len(paths)}개 확인, {removed}개 삭제 완료")
+    return removed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="참조되지 않는 문제 이미지를 정리합니다.")
+    parser.add_argument("--apply", action="store_true", help="실제로 삭제합니다. (기본값은 dry-run)")
+    parser.add_argument("--grace-hours", type=float, default=DEFAULT_GRACE_HOURS, help="이 시간보다 최근에 올라간 파일은 건너뜁니다.")
+    args = parser.parse_args()
+
+    supabase_url, supabase_key = load_supabase_credentials()
+    supabase = create_client(supabase_url, supabase_key)
+    public_url_prefix = f"{supabase_url.rstrip('/')}/storage/v1/object/public/{BUCKET_NAME}/"
+
+    print(f"'{BUCKET_NAME}' 버킷의 파일 목록을 불러오는 중...")
+    objects = list_bucket_objects(supabase)
+    # 파일 목록을 먼저 가져온 뒤 참조를 확인해야, 그 사이에 저장된 문제의 이미지를 지우지 않습니다.
+    print("문제에서 사용 중인 이미지를 확인하는 중...")
+    referenced = collect_referenced_paths(supabase, public_url_prefix)
+    orphans = find_orphans(objects, referenced, timedelta(hours=args.grace_hours))
+
+    print(f"\n전체 파일: {len(objects)}개 | 사용 중: {len(referenced & objects.keys())}개 | 삭제 대상: {len(orphans)}개")
+    for path in orphans:
+        print(f"  - {path} ({objects[path].isoformat()})")
+
+    if not orphans:
+        print("\n✅ 정리할 이미지가 없습니다.")
+    elif args.apply:
+        print("\n삭제하는 중...")
+        removed = remove_in_batches(supabase, orphans, public_url_prefix)
+        print(f"\n✅ {removed}개의 이미지를 삭제했습니다.")
+    else:
+        print("\nℹ️ dry-run 모드입니다. 실제로 삭제하려면 --apply 옵션을 붙여 실행하세요.")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    try:
+        main()
+    except Exception:
+        # 주기 실행(cron 등)에서 실패를 알 수 있도록 스택 트레이스를 남기고 0이 아닌 코드로 종료합니다.
+        logger.exception("🚨 이미지 정리 중 예상치 못한 오류가 발생했습니다.")
+        sys.exit(1)
@@ -0,0 +1,22 @@
+-- 증분 동기화(TableSnapshot)를 위한 updated_at 컬럼과 자동 갱신 트리거
+alter table public.problems
+    add column if not exists updated_at timestamptz not null default now();
+
+create or replace function public.set_updated_at()
+returns trigger
+language plpgsql
+as $$
+begin
+    new.updated_at = now();
+    return new;
+end;
+$$;
+
+drop trigger if exists problems_set_updated_at on public.problems;
+create trigger problems_set_updated_at
+    before update on public.problems
+    for each row execute function public.set_updated_at();
+
+-- 변경분 조회(updated_at/created_at >= 마지막 동기화 시각)용 인덱스
+create index if not exists problems_updated_at_idx on public.problems (updated_at);
+create index if not exists solutions_created_at_idx on public.solutions (created_at);
@@ -0,0 +1,4 @@
+-- 업로드 시 함께 만드는 썸네일 이미지의 공개 URL
+alter table public.problems
+    add column if not exists question_thumb_url text,
+    add column if not exists explanation_thumb_url text;
@@ -0,0 +1,18 @@
+-- 같은 사용자가 같은 문제를 여러 번 맞혀도 풀이 기록은 하나만 남도록 합니다.
+-- 1. 기존 중복 기록 정리 (가장 먼저 푼 기록만 남김, solved_at이 비어 있는 기록은 가장 나중으로 취급)
+delete from public.solutions
+where id in (
+    select id
+    from (
+        select id, row_number() over (
+            partition by problem_id, user_email
+            order by solved_at asc nulls last, id
+        ) as solve_rank
+        from public.solutions
+    ) ranked
+    where solve_rank > 1
+);
+
+-- 2. 앱의 upsert(on_conflict="problem_id,user_email")가 사용하는 고유 인덱스
+create unique index if not exists solutions_problem_id_user_email_key
+    on public.solutions (problem_id, user_email);
@@ -0,0 +1,18 @@
+-- 변경 피드(RealtimeChangeFeed)가 problems/solutions의 행 변경을 받을 수 있도록 Realtime 발행 대상에 추가
+-- DELETE 이벤트의 old_record에는 기본 키(id)만 담기며, 앱은 id만 사용합니다.
+do $$
+begin
+    if not exists (
+        select 1 from pg_publication_tables
+        where pubname = 'supabase_realtime' and schemaname = 'public' and tablename = 'problems'
+    ) then
+        alter publication supabase_realtime add table public.problems;
+    end if;
+    if not exists (
+        select 1 from pg_publication_tables
+        where pubname = 'supabase_realtime' and schemaname = 'public' and tablename = 'solutions'
+    ) then
+        alter publication supabase_realtime add table public.solutions;
+    end if;
+end;
+$$;
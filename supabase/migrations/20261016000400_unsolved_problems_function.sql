@@ -0,0 +1,17 @@
+-- "푼 문제 숨기기" 목록 조회용: 사용자가 푼 문제를 anti-join으로 제외한 problems
+-- 앱이 푼 문제 id 목록을 not.in.(...) 필터로 URL에 싣지 않도록 PostgREST RPC로 호출합니다.
+-- (select/필터/정렬/범위는 일반 테이블 조회처럼 결과에 이어서 적용됩니다)
+create or replace function public.unsolved_problems(solver_email text)
+returns setof public.problems
+language sql
+stable
+as $$
+    select p.*
+    from public.problems p
+    where not exists (
+        select 1
+        from public.solutions s
+        where s.problem_id = p.id
+          and s.user_email = solver_email
+    );
+$$;
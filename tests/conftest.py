@@ -0,0 +1,14 @@
+"""app.py를 import하기 전에 빈 secrets.toml이 있는 임시 작업 디렉터리와 SQLite 백엔드를 준비합니다."""
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORKDIR = tempfile.mkdtemp(prefix="study-inside-tests-")
+
+os.makedirs(os.path.join(WORKDIR, ".streamlit"))
+open(os.path.join(WORKDIR, ".streamlit", "secrets.toml"), "w").close()
+os.chdir(WORKDIR)
+os.environ["DATA_BACKEND"] = "sqlite"
+os.environ["CHANGE_FEED"] = "local"
+sys.path.insert(0, ROOT)
@@ -0,0 +1,158 @@
+import asyncio
+import sys
+import time
+import types
+
+import pytest
+
+import app
+
+NOW = "2026-01-01T00:00:00+00:00"
+
+
+class CountingRepository:
+    """SQLiteRepository 호출을 그대로 넘기면서 어떤 메서드가 불렸는지 기록"""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.calls = []
+
+    def __getattr__(self, name):
+        method = getattr(self.backend, name)
+
+        def call(*args, **kwargs):
+            self.calls.append(name)
+            return method(*args, **kwargs)
+
+        return call
+
+
+@pytest.fixture
+def repo(tmp_path):
+    backend = app.SQLiteRepository(str(tmp_path / "study_inside.sqlite3"))
+    backend.upsert_rows("problems", [
+        {"id": f"p{i}", "title": f"문제 {i}", "category": "수학2", "created_at": NOW, "updated_at": NOW}
+        for i in range(3)
+    ])
+    return CountingRepository(backend)
+
+
+@pytest.fixture
+def snapshot(repo, monkeypatch):
+    snapshot = app.TableSnapshot("problems")
+    # 백그라운드 스레드 대신 바로 동기화해서 어떤 조회를 했는지 확인합니다.
+    monkeypatch.setattr(snapshot, "refresh_in_background", snapshot.sync)
+    feed = app.LocalChangeFeed()
+    feed.subscribe(snapshot)
+    snapshot.ensure_fresh(repo)
+    repo.calls.clear()
+    return snapshot
+
+
+def age(snapshot, seconds):
+    snapshot.last_synced = time.monotonic() - seconds
+
+
+def test_publish_updates_snapshot_without_remote_calls(repo, snapshot):
+    feed = snapshot.change_feed
+    feed.publish("problems", "INSERT", {"id": "p9", "title": "새 문제", "category": "수학2", "updated_at": NOW})
+    feed.publish("problems", "UPDATE", {"id": "p1", "title": "고친 문제", "updated_at": NOW})
+    feed.publish("problems", "DELETE", old_record={"id": "p0"})
+
+    assert set(snapshot.rows) == {"p1", "p2", "p9"}
+    assert snapshot.rows["p1"]["title"] == "고친 문제"
+    assert set(snapshot.frame()["id"]) == {"p1", "p2", "p9"}
+
+    # 피드가 연결돼 있으면 SNAPSHOT_SYNC_INTERVAL이 지나도 원격에 확인하지 않습니다.
+    age(snapshot, app.SNAPSHOT_SYNC_INTERVAL + 1)
+    snapshot.ensure_fresh(repo)
+    assert repo.calls == []
+
+
+def test_publish_before_first_sync_is_ignored(repo):
+    snapshot = app.TableSnapshot("problems")
+    feed = app.LocalChangeFeed()
+    feed.subscribe(snapshot)
+    feed.publish("problems", "INSERT", {"id": "p9", "title": "새 문제", "updated_at": NOW})
+    assert snapshot.rows == {}
+
+    snapshot.ensure_fresh(repo)
+    assert set(snapshot.rows) == {"p0", "p1", "p2"}
+
+
+def test_disconnected_feed_falls_back_to_probing(repo, snapshot):
+    snapshot.change_feed.set_live(False)
+    age(snapshot, app.SNAPSHOT_SYNC_INTERVAL + 1)
+    snapshot.ensure_fresh(repo)
+    assert repo.calls == ["fetch_change_marker"]
+
+    # 끊긴 동안의 변경은 다음 확인에서 변경분 조회로 반영됩니다.
+    repo.backend.upsert_rows("problems", [{"id": "p9", "title": "새 문제", "created_at": NOW,
+                                           "updated_at": "2026-01-02T00:00:00+00:00"}])
+    repo.calls.clear()
+    age(snapshot, app.SNAPSHOT_SYNC_INTERVAL + 1)
+    snapshot.ensure_fresh(repo)
+    assert repo.calls[:2] == ["fetch_change_marker", "fetch_rows"]
+    assert "p9" in snapshot.rows
+
+
+def test_reconnect_marks_snapshot_stale(repo, snapshot):
+    feed = snapshot.change_feed
+    feed.set_live(False)
+    feed.set_live(True)
+    snapshot.ensure_fresh(repo)
+    assert repo.calls == ["fetch_change_marker"]
+
+
+def fake_realtime_module(clients, subscribe_states):
+    """구독 상태 콜백을 정해진 순서로 부르고, 곧 소켓 수신이 끝나는 가짜 realtime 모듈"""
+
+    class FakeChannel:
+        def __init__(self, client):
+            self.client = client
+
+        def on_postgres_changes(self, event, callback, table, schema):
+            pass
+
+        async def subscribe(self, callback):
+            callback(subscribe_states.pop(0) if subscribe_states else "SUBSCRIBED", None)
+            self.client._listen_task = asyncio.ensure_future(asyncio.sleep(0.01))
+
+    class FakeClient:
+        def __init__(self, url, token, auto_reconnect=True):
+            self.auto_reconnect = auto_reconnect
+            self._listen_task = None
+            clients.append(self)
+
+        def channel(self, topic):
+            return FakeChannel(self)
+
+        async def close(self):
+            pass
+
+    states = types.SimpleNamespace(SUBSCRIBED="SUBSCRIBED", CHANNEL_ERROR="CHANNEL_ERROR")
+    return types.SimpleNamespace(AsyncRealtimeClient=FakeClient, RealtimeSubscribeStates=states)
+
+
+def test_realtime_feed_goes_offline_when_socket_closes(monkeypatch):
+    clients = []
+    monkeypatch.setitem(sys.modules, "realtime", fake_realtime_module(clients, ["SUBSCRIBED", "CHANNEL_ERROR"]))
+    monkeypatch.setattr(app, "CHANGE_FEED_RETRY_DELAY", 0.01)
+    feed = app.RealtimeChangeFeed("https://example.supabase.co", "key", ["problems"])
+    history = []
+    set_live = feed.set_live
+    monkeypatch.setattr(feed, "set_live", lambda live: (history.append(live), set_live(live)))
+
+    async def run_briefly():
+        try:
+            await asyncio.wait_for(feed._run(), timeout=0.2)
+        except asyncio.TimeoutError:
+            pass
+
+    asyncio.run(run_briefly())
+
+    assert len(clients) >= 3
+    assert all(client.auto_reconnect is False for client in clients)
+    # 소켓이 닫히면 상태 콜백이 없어도 live를 내리고, 구독 오류 뒤에는 다시 연결합니다.
+    assert history[:2] == [True, False]
+    assert True in history[2:]
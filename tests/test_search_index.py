@@ -0,0 +1,97 @@
+import random
+import time
+
+import pytest
+
+import app
+
+SYLLABLES = "가나다라마미분적확률통계기하함수극한"
+QUERIES = ["미분", "가", "확률 통계", "함수극", "적분 기", "zz", "극한값", "특별"]
+
+
+def text(rng, words):
+    return " ".join("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(1, 4))) for _ in range(words))
+
+
+def problem(rng, doc_id):
+    return {"id": doc_id, "title": text(rng, 3), "question": text(rng, 20), "explanation": text(rng, 30)}
+
+
+def substring_search(documents: dict, query: str) -> set:
+    """색인 없이 정규화한 원문에서 모든 단어를 찾는 기준 결과"""
+    terms = app.NGramIndex.normalize(query).split()
+    return {
+        doc_id for doc_id, row in documents.items()
+        if all(any(term in app.NGramIndex.normalize(row[field]) for field in app.SEARCH_FIELD_WEIGHTS) for term in terms)
+    }
+
+
+def wait_for_build(index, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while index.gram_slots is None or index.changed_during_build is not None:
+        assert time.monotonic() < deadline, "검색 색인 빌드가 끝나지 않았습니다."
+        time.sleep(0.01)
+
+
+def assert_matches(index, documents):
+    for query in QUERIES:
+        assert set(index.search(query)) == substring_search(documents, query), query
+
+
+@pytest.fixture
+def rng():
+    return random.Random(7)
+
+
+def test_search_matches_substring_filter_across_upserts_deletes_and_rebuilds(rng, monkeypatch):
+    monkeypatch.setattr(app, "SEARCH_INDEX_REBUILD_THRESHOLD", 40)
+    index = app.NGramIndex(app.SEARCH_FIELD_WEIGHTS)
+    documents = {f"p{i}": problem(rng, f"p{i}") for i in range(300)}
+    index.upsert(list(documents.values()))
+    assert_matches(index, documents)  # 첫 빌드 전에는 원문을 모두 확인
+    wait_for_build(index)
+    assert_matches(index, documents)
+
+    # 보조 색인(빌드 이후 변경분)과 삭제 표시가 기본 색인과 합쳐지는지 여러 번의 재빌드에 걸쳐 확인
+    next_id = 300
+    for _ in range(5):
+        for _ in range(15):
+            action = rng.random()
+            if action < 0.4:
+                doc_id = rng.choice(list(documents))
+                documents[doc_id] = problem(rng, doc_id)
+                index.upsert([documents[doc_id]])
+            elif action < 0.7:
+                doc_id = f"p{next_id}"
+                next_id += 1
+                documents[doc_id] = problem(rng, doc_id)
+                index.upsert([documents[doc_id]])
+            else:
+                doc_id = rng.choice(list(documents))
+                del documents[doc_id]
+                index.delete([doc_id])
+            assert_matches(index, documents)
+        wait_for_build(index)
+        assert_matches(index, documents)
+
+
+def test_changes_during_build_move_to_the_overlay(rng, monkeypatch):
+    index = app.NGramIndex(app.SEARCH_FIELD_WEIGHTS)
+    documents = {f"p{i}": problem(rng, f"p{i}") for i in range(100)}
+    build = app.NGramIndex._build
+
+    def build_with_concurrent_changes(self, snapshot_documents):
+        # 빌드가 문서 목록을 복사한 뒤에 들어온 수정/추가/삭제
+        documents["p1"] = {**documents["p1"], "title": "특별한 제목"}
+        documents["new"] = {"id": "new", "title": "특별 추가", "question": "", "explanation": ""}
+        del documents["p2"]
+        self.upsert([documents["p1"], documents["new"]])
+        self.delete(["p2"])
+        build(self, snapshot_documents)
+
+    monkeypatch.setattr(app.NGramIndex, "_build", build_with_concurrent_changes)
+    index.upsert(list(documents.values()))
+    wait_for_build(index)
+
+    assert set(index.search("특별")) == {"p1", "new"}
+    assert_matches(index, documents)
@@ -0,0 +1,99 @@
+import time
+
+import httpx
+import pytest
+
+import app
+
+
+class FlakyRepository:
+    """SQLiteRepository에 insert_solutions를 넘기되, 정해진 횟수만큼 연결 오류를 내고 특정 문제의 행은 거절"""
+
+    def __init__(self, backend, transient_failures=0, rejected_problem_ids=()):
+        self.backend = backend
+        self.transient_failures = transient_failures
+        self.rejected_problem_ids = set(rejected_problem_ids)
+        self.attempts = 0
+
+    def insert_solutions(self, rows):
+        self.attempts += 1
+        if self.transient_failures:
+            self.transient_failures -= 1
+            raise httpx.ConnectError("connection refused")
+        if any(row["problem_id"] in self.rejected_problem_ids for row in rows):
+            raise ValueError("insert or update on table \"solutions\" violates foreign key constraint")
+        self.backend.insert_solutions(rows)
+
+
+@pytest.fixture
+def backend(tmp_path, monkeypatch):
+    monkeypatch.setattr(app, "SOLUTION_FLUSH_INTERVAL", 0.01)
+    monkeypatch.setattr(app, "SOLUTION_RETRY_BASE_DELAY", 0.01)
+    return app.SQLiteRepository(str(tmp_path / "study_inside.sqlite3"))
+
+
+@pytest.fixture
+def snapshot():
+    snapshot = app.TableSnapshot("solutions")
+    snapshot.add_listener(app.SolvedSetIndex())
+    return snapshot
+
+
+def solution(problem_id, user_email="student@example.com"):
+    return {"id": f"s-{problem_id}", "problem_id": problem_id, "user_email": user_email, "user_name": "학생",
+            "solved_at": "2026-01-01T00:00:00+00:00"}
+
+
+def submit(queue, snapshot, row):
+    """save_solution_to_db처럼 큐에 넣고 스냅샷에 바로 반영"""
+    queue.enqueue(row)
+    snapshot.record_upserts([row])
+
+
+def wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "시간 안에 조건을 만족하지 못했습니다."
+        time.sleep(0.01)
+
+
+def test_transient_error_is_retried_until_saved(backend, snapshot):
+    repo = FlakyRepository(backend, transient_failures=2)
+    queue = app.SolutionWriteQueue(repo, snapshot)
+    submit(queue, snapshot, solution("p1"))
+
+    wait_until(lambda: backend.fetch_ids("solutions") == {"s-p1"})
+    assert repo.attempts == 3
+    assert "s-p1" in snapshot.rows
+    assert queue.take_failures("student@example.com") == []
+    queue.close()
+
+
+def test_rejected_row_is_rolled_back_and_reported_once(backend, snapshot):
+    repo = FlakyRepository(backend, rejected_problem_ids={"deleted"})
+    queue = app.SolutionWriteQueue(repo, snapshot)
+    solved_index = snapshot.listeners[0]
+    submit(queue, snapshot, solution("p1"))
+    submit(queue, snapshot, solution("deleted"))
+    submit(queue, snapshot, solution("p2"))
+
+    wait_until(lambda: "deleted" not in solved_index.solved_by("student@example.com"))
+    wait_until(lambda: backend.fetch_ids("solutions") == {"s-p1", "s-p2"})
+    assert set(snapshot.rows) == {"s-p1", "s-p2"}
+    assert solved_index.solved_by("student@example.com") == {"p1", "p2"}
+    assert [row["id"] for row in queue.take_failures("student@example.com")] == ["s-deleted"]
+    assert queue.take_failures("student@example.com") == []
+    queue.close()
+
+
+def test_close_drains_the_queue(backend, snapshot, monkeypatch):
+    monkeypatch.setattr(app, "SOLUTION_FLUSH_INTERVAL", 60)  # 시간 기준으로는 저장되지 않도록
+    queue = app.SolutionWriteQueue(FlakyRepository(backend), snapshot)
+    for problem_id in ("p1", "p2", "p3"):
+        submit(queue, snapshot, solution(problem_id))
+
+    started = time.monotonic()
+    queue.close()
+    assert time.monotonic() - started < 5
+    assert backend.fetch_ids("solutions") == {"s-p1", "s-p2", "s-p3"}
+    assert not queue.thread.is_alive()
@@ -0,0 +1,93 @@
+import types
+
+import app
+
+MAX_ROWS = 50  # 가짜 PostgREST의 max-rows
+
+
+class FakeQuery:
+    """select/gte/gt/order/range/limit만 흉내 내고, 요청마다 최대 MAX_ROWS행만 돌려주는 PostgREST 쿼리"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.orders = []
+        self.start, self.end = 0, None
+
+    def select(self, columns, count=None):
+        self.columns = None if columns == "*" else columns.split(",")
+        return self
+
+    def gte(self, column, value):
+        self.rows = [row for row in self.rows if row[column] >= value]
+        return self
+
+    def gt(self, column, value):
+        self.rows = [row for row in self.rows if row[column] > value]
+        return self
+
+    def order(self, column, desc=False):
+        self.orders.append((column, desc))
+        return self
+
+    def range(self, start, end):
+        self.start, self.end = start, end + 1
+        return self
+
+    def limit(self, size):
+        self.end = self.start + size
+        return self
+
+    def execute(self):
+        rows = self.rows
+        for column, desc in reversed(self.orders):
+            rows = sorted(rows, key=lambda row: row[column], reverse=desc)
+        rows = rows[self.start:self.end][:MAX_ROWS]
+        if self.columns is not None:
+            rows = [{column: row.get(column) for column in self.columns} for row in rows]
+        return types.SimpleNamespace(data=rows, count=None)
+
+
+class FakeClient:
+    def __init__(self, tables):
+        self.tables = tables
+        self.requests = 0
+
+    def table(self, name):
+        self.requests += 1
+        return FakeQuery(self.tables[name])
+
+
+def problem(i):
+    timestamp = f"2026-01-01T00:{i // 60:02d}:{i % 60:02d}+00:00"
+    return {"id": f"p{i:04d}", "title": f"문제 {i}", "category": "수학2", "created_at": timestamp,
+            "updated_at": timestamp}
+
+
+def make_repository(monkeypatch, count):
+    monkeypatch.setattr(app, "SUPABASE_PAGE_SIZE", MAX_ROWS)
+    client = FakeClient({"problems": [problem(i) for i in range(count)]})
+    return client, app.SupabaseRepository(client, "https://example.supabase.co")
+
+
+def test_fetch_rows_and_ids_page_past_the_row_cap(monkeypatch):
+    client, repo = make_repository(monkeypatch, 3 * MAX_ROWS + 7)
+
+    rows = repo.fetch_rows("problems", "id,updated_at", "updated_at", None)
+    assert [row["id"] for row in rows] == [f"p{i:04d}" for i in range(3 * MAX_ROWS + 7)]
+    assert len(repo.fetch_ids("problems")) == 3 * MAX_ROWS + 7
+
+    since = problem(2 * MAX_ROWS)["updated_at"]
+    assert len(repo.fetch_rows("problems", "id,updated_at", "updated_at", since)) == MAX_ROWS + 7
+
+
+def test_delete_check_keeps_rows_past_the_row_cap(monkeypatch):
+    client, repo = make_repository(monkeypatch, 3 * MAX_ROWS)
+    snapshot = app.TableSnapshot("problems")
+    snapshot.sync(repo)
+    assert len(snapshot.rows) == 3 * MAX_ROWS
+
+    # 원격에서 하나를 지우고 삭제 확인을 강제하면 그 행만 빠져야 합니다.
+    client.tables["problems"] = [row for row in client.tables["problems"] if row["id"] != "p0120"]
+    snapshot.sync(repo, force=True)
+    assert len(snapshot.rows) == 3 * MAX_ROWS - 1
+    assert "p0120" not in snapshot.rows